@@ -0,0 +1,35 @@
+import io
+import zlib
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class GzipJSONParser(JSONParser):
+    """JSON-парсер, который также принимает тела, сжатые gzip (Content-Encoding: gzip)"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = (parser_context or {}).get('request')
+        encoding = request.META.get('HTTP_CONTENT_ENCODING', '') if request is not None else ''
+
+        if encoding.strip().lower() == 'gzip':
+            stream = io.BytesIO(self.decompress(stream.read()))
+
+        return super().parse(stream, media_type, parser_context)
+
+    @staticmethod
+    def decompress(data):
+        # Ограничиваем размер распакованного тела тем же лимитом, что и обычные запросы
+        limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            if limit is None:
+                return decompressor.decompress(data) + decompressor.flush()
+            body = decompressor.decompress(data, limit + 1)
+        except zlib.error as exc:
+            raise ParseError(f'Gzip decode error - {exc}')
+
+        if len(body) > limit or decompressor.unconsumed_tail:
+            raise ParseError('Decompressed request body is too large')
+        return body
@@ -8,6 +8,7 @@ from rest_framework.pagination import PageNumberPagination
 
 
 from users.serializers import CustomUserSerializer
+from .parsers import GzipJSONParser
 from .serializers import *
 from .models import *
 
@@ -131,6 +132,8 @@ class NewsAPIView(APIView):
 
 
 class NewsParsAPIView(APIView):
+    # Парсер присылает пакеты новостей сжатыми gzip
+    parser_classes = (GzipJSONParser, )
 
     @staticmethod
     def post(request):
@@ -1,6 +1,8 @@
+import hashlib
 import os
 from pathlib import Path
 import sys
+from typing import List
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import pickle
@@ -23,10 +25,16 @@ MODELS_DIR = os.path.join(BASE_DIR, "ml_model", "models")
 
 try:
     with open(os.path.join(MODELS_DIR, 'vectorizer.pkl'), 'rb') as f:
-        vectorizer: TfidfVectorizer = pickle.load(f)
+        vectorizer_data = f.read()
+        vectorizer: TfidfVectorizer = pickle.loads(vectorizer_data)
     
     with open(os.path.join(MODELS_DIR, 'classifier.pkl'), 'rb') as f:
-        classifier: LogisticRegression = pickle.load(f)
+        classifier_data = f.read()
+        classifier: LogisticRegression = pickle.loads(classifier_data)
+    
+    # Версия модели - хэш файлов векторизатора и классификатора: клиенты
+    # по ней сбрасывают закэшированные категории после переобучения
+    MODEL_VERSION = hashlib.sha256(vectorizer_data + classifier_data).hexdigest()[:16]
 except Exception as e:
     raise RuntimeError(f"Ошибка загрузки моделей: {str(e)}")
 
@@ -36,10 +44,18 @@ class TextRequest(BaseModel):
 class PredictionResponse(BaseModel):
     prediction: str
     confidence: float
+    model_version: str = MODEL_VERSION
+
+class BatchTextRequest(BaseModel):
+    texts: List[str]
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
+    model_version: str = MODEL_VERSION
 
 @app.get("/")
 async def health_check():
-    return {"status": "OK", "message": "Сервис классификации новостей работает"}
+    return {"status": "OK", "message": "Сервис классификации новостей работает", "model_version": MODEL_VERSION}
 
 @app.post("/predict", response_model=PredictionResponse)
 async def predict(request: TextRequest):
@@ -63,6 +79,30 @@ async def predict(request: TextRequest):
             detail=f"Ошибка при обработке запроса: {str(e)}"
         )
 
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(request: BatchTextRequest):
+    """Классифицирует список текстов одним вызовом векторизатора и модели"""
+    if not request.texts:
+        return {"predictions": []}
+    try:
+        vectorized_texts = vectorizer.transform(request.texts)
+        probabilities = classifier.predict_proba(vectorized_texts)
+        class_indices = np.argmax(probabilities, axis=1)
+        confidences = probabilities[np.arange(len(class_indices)), class_indices]
+        predictions = classifier.classes_[class_indices]
+        
+        return {
+            "predictions": [
+                {"prediction": prediction, "confidence": float(confidence)}
+                for prediction, confidence in zip(predictions, confidences)
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ошибка при обработке запроса: {str(e)}"
+        )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
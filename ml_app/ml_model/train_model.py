@@ -10,10 +10,27 @@ import sys
 
 from config import BASE_DIR
 
+def load_dataset():
+    """
+    Загружает датасет из более свежего файла: Parquet (читается быстрее),
+    если он выгружен не раньше CSV, иначе CSV
+    """
+    parquet_path = os.path.join(BASE_DIR, "news_dataset.parquet")
+    csv_path = os.path.join(BASE_DIR, "news_dataset.csv")
+    if os.path.exists(parquet_path):
+        if os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(parquet_path):
+            print(f"{csv_path} новее {parquet_path}, читаем CSV")
+        else:
+            try:
+                return pd.read_parquet(parquet_path)
+            except ImportError:
+                print("pyarrow не установлен, читаем CSV")
+    
+    return pd.read_csv(csv_path)
+
 def train_classifier():
     # 1. Загрузка данных
-    csv_path = os.path.join(BASE_DIR, "news_dataset.csv")
-    df = pd.read_csv(csv_path)
+    df = load_dataset()
     
     # Очистка данных
     print("\nПредварительная обработка данных:")
@@ -31,7 +48,7 @@ def train_classifier():
     
     # 2. Подготовка данных
     X = df['text'].values  # тексты новостей
-    y = df['label'].values  # категории
+    y = np.asarray(df['label'])  # категории (в Parquet хранятся словарем)
     
     # Разделение на тренировочную и тестовую выборки
     X_train, X_test, y_train, y_test = train_test_split(
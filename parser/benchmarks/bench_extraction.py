@@ -0,0 +1,66 @@
+"""
+Сравнение бэкендов разбора HTML на сохраненных детальных страницах.
+
+Для каждой страницы из каталога извлекает новость каждым бэкендом,
+проверяет, что результат совпадает с эталонным html.parser, и выводит
+среднее время разбора одной страницы.
+
+Запуск из каталога parser:
+    python -m benchmarks.bench_extraction --source rscf --pages-dir fixtures/rscf/detail
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+from models.extraction import BACKENDS, get_backend
+from models.parser_factory import ParserFactory
+
+
+def load_pages(pages_dir: str) -> dict:
+    """Загружает все *.html из каталога (рекурсивно)"""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(pages_dir, '**', '*.html'), recursive=True)):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages[os.path.relpath(path, pages_dir)] = f.read()
+    return pages
+
+
+def run(source: str, pages_dir: str, repeat: int) -> bool:
+    pages = load_pages(pages_dir)
+    if not pages:
+        print(f"В каталоге {pages_dir} нет HTML-страниц")
+        return False
+
+    parser = ParserFactory.get_parser(source)
+    reference = {}
+    identical = True
+
+    for name in BACKENDS:
+        parser.extractor = get_backend(name)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            results = {page: parser.parse_news_detail(html) for page, html in pages.items()}
+        per_page = (time.perf_counter() - started) / (repeat * len(pages))
+
+        if not reference:
+            reference = results
+        mismatched = [page for page in pages if results[page] != reference[page]]
+        identical = identical and not mismatched
+
+        print(f"{parser.extractor.name:>12}: {per_page * 1000:.2f} мс/страница, "
+              f"расхождений с html.parser: {len(mismatched)}")
+        for page in mismatched:
+            print(f"    расхождение: {page}")
+
+    return identical
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--source', required=True, help="Источник из ParserFactory (rscf, nauka_rf)")
+    arg_parser.add_argument('--pages-dir', required=True, help="Каталог с сохраненными детальными страницами")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Сколько раз разбирать каждую страницу")
+    args = arg_parser.parse_args()
+    sys.exit(0 if run(args.source, args.pages_dir, args.repeat) else 1)
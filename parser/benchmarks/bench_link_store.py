@@ -0,0 +1,83 @@
+"""
+Стоимость вставки и поиска в хранилище обработанных ссылок на больших объемах.
+
+Заполняет LinkStore пакетами до заданного числа ссылок, затем измеряет
+поиск существующих и отсутствующих ссылок. Для сравнения измеряет прежнюю
+схему: загрузку всего JSON-файла в set и его полную перезапись.
+
+Запуск из каталога parser:
+    python -m benchmarks.bench_link_store --links 1000000 --batch 1000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from utils.link_store import LinkStore
+
+
+def make_link(n: int) -> str:
+    return f"/news/{n // 1000}/{n}-novost-o-nauchnom-otkrytii/"
+
+
+def bench_link_store(path: str, links: int, batch: int, lookups: int) -> None:
+    store = LinkStore('bench', path=path)
+
+    started = time.perf_counter()
+    for start in range(0, links, batch):
+        store.add_many(make_link(n) for n in range(start, min(start + batch, links)))
+    insert_duration = time.perf_counter() - started
+    print(f"LinkStore: вставка {links} ссылок пакетами по {batch}: {insert_duration:.2f} сек. "
+          f"({insert_duration / (links / batch) * 1000:.2f} мс/пакет)")
+
+    started = time.perf_counter()
+    for _ in range(batch):
+        store.add_many([make_link(links + random.randrange(1_000_000))])
+    print(f"LinkStore: одиночная вставка при {links} ссылках: "
+          f"{(time.perf_counter() - started) / batch * 1e6:.1f} мкс")
+
+    for name, sample in (
+        ('существующих', [make_link(random.randrange(links)) for _ in range(lookups)]),
+        ('отсутствующих', [make_link(links * 2 + n) for n in range(lookups)]),
+    ):
+        started = time.perf_counter()
+        found = sum(1 for link in sample if link in store)
+        per_lookup = (time.perf_counter() - started) / lookups
+        print(f"LinkStore: поиск {name} ссылок: {per_lookup * 1e6:.1f} мкс/поиск (найдено {found})")
+
+    store.close()
+    print(f"LinkStore: размер файла {os.path.getsize(path) / 2 ** 20:.1f} МБ")
+
+
+def bench_json(path: str, links: int) -> None:
+    """Прежняя схема: весь набор ссылок читается и перезаписывается на каждом запуске"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([make_link(n) for n in range(links)], f, ensure_ascii=False)
+
+    started = time.perf_counter()
+    with open(path, 'r', encoding='utf-8') as f:
+        processed = set(json.load(f))
+    load_duration = time.perf_counter() - started
+
+    processed.add(make_link(links))
+    started = time.perf_counter()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(list(processed), f, ensure_ascii=False)
+    save_duration = time.perf_counter() - started
+
+    print(f"JSON: загрузка {links} ссылок {load_duration:.2f} сек., "
+          f"перезапись после добавления одной {save_duration:.2f} сек.")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--links', type=int, default=1_000_000, help="Сколько ссылок вставить")
+    arg_parser.add_argument('--batch', type=int, default=1000, help="Размер пакета вставки")
+    arg_parser.add_argument('--lookups', type=int, default=100_000, help="Сколько поисков измерить")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_link_store(os.path.join(tmp, 'links.sqlite3'), args.links, args.batch, args.lookups)
+        bench_json(os.path.join(tmp, 'links.json'), args.links)
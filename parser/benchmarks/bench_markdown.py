@@ -0,0 +1,161 @@
+"""
+Микробенчмарк рендера больших статей в markdown.
+
+Строит статьи rscf.ru и наука.рф из paragraphs абзацев по links ссылок
+в каждом, разбирает их один раз и сравнивает время рендера контента
+прежним способом (.text и замена текста каждой ссылки в rscf, сборка
+списка и re.sub в наука.рф) и однопроходным MarkdownRenderer.
+Проверяет, что результаты совпадают (тексты ссылок в статьях уникальны,
+иначе прежний способ портит текст).
+
+Запуск из каталога parser:
+    python -m benchmarks.bench_markdown --paragraphs 200 1000 5000 --links 4
+"""
+import argparse
+import re
+import sys
+import time
+from typing import Callable, List
+
+from bs4 import BeautifulSoup, Tag
+
+from models.parsers.nauka_rf import INTRO, NaukaRfMarkdown
+from models.parsers.rscf_parser import RscfMarkdown
+
+
+def build_rscf_article(paragraphs: int, links: int) -> str:
+    body = []
+    for i in range(paragraphs):
+        anchors = ' '.join(f'текст <a href="/news/{i}/{j}/">ссылка {i}-{j}</a> продолжение' for j in range(links))
+        body.append(f"<p>Абзац {i}: {anchors}.</p>")
+        if i % 20 == 10:
+            body.append(f'<blockquote><p>Цитата {i} со <a href="q/{i}/">ссылкой {i}</a>.</p></blockquote>')
+        if i % 25 == 0:
+            body.append(f'<div class="b-news-detail-picture"><img src="/upload/{i}.jpg"><p>Подпись {i}</p></div>')
+    return f'<div class="b-news-detail-content">{"".join(body)}</div>'
+
+
+def build_nauka_article(paragraphs: int, links: int) -> str:
+    body = ['<p><b>Вводный текст статьи.</b></p>']
+    for i in range(paragraphs):
+        anchors = ' '.join(f'текст <a href="/n/{i}/{j}/">ссылка {i}-{j}</a>' for j in range(links))
+        body.append(f"<p>Абзац {i}: {anchors}.<br>Вторая строка.</p>")
+        if i % 25 == 0:
+            body.append(f'<img-wyz src="https://наука.рф/upload/{i}.jpg"></img-wyz>')
+        if i % 40 == 0:
+            body.append('<p> </p>')
+    return f'<div class="u-news-detail-page__text-content">{"".join(body)}</div>'
+
+
+def legacy_rscf(content: Tag) -> str:
+    """Прежний рендер контента rscf.ru: find_all по блокам и замена текста каждой ссылки"""
+    def process_links(element: Tag) -> str:
+        text = element.text.strip()
+        for link in element.find_all('a'):
+            link_text = link.text.strip()
+            link_url = link.get('href', '')
+            if link_url.startswith('/'):
+                link_url = f"https://rscf.ru{link_url}"
+            elif not link_url.startswith(('http://', 'https://')):
+                link_url = f"https://rscf.ru/{link_url}"
+            text = text.replace(link_text, f"[{link_text}]({link_url})")
+        return text
+
+    markdown_content = []
+    for element in content.find_all(['p', 'blockquote', 'img', 'div']):
+        if element.name in ['img', 'div'] and element.get('class') == ['b-news-detail-picture']:
+            img = element if element.name == 'img' else element.find('img')
+            if img and img.get('src'):
+                img_src = img.get('src')
+                if img_src.startswith('/'):
+                    img_src = f"https://rscf.ru{img_src}"
+                markdown_content.append(f"![image]({img_src})")
+        elif element.name == 'blockquote':
+            markdown_content.append(f"> {process_links(element)}")
+        elif element.name == 'p' and not element.find_parent('blockquote'):
+            markdown_content.append(process_links(element))
+    return '\n\n'.join(markdown_content)
+
+
+def legacy_nauka(content: Tag) -> str:
+    """Прежний рендер контента наука.рф: список строк, join и re.sub"""
+    markdown_content = []
+    intro = content.find('b')
+    if intro:
+        markdown_content.append(f"**{intro.text.strip()}**\n")
+    previous_was_image = False
+    for element in content.find_all(['p', 'br', 'img-wyz']):
+        if element.name == 'img-wyz':
+            src = element.get('src', '')
+            if src:
+                if not previous_was_image:
+                    markdown_content.append("")
+                markdown_content.append(f"![image]({src})")
+                previous_was_image = True
+        elif element.name == 'p':
+            text = element.text.strip()
+            if text:
+                if previous_was_image:
+                    markdown_content.append("")
+                markdown_content.append(text)
+                previous_was_image = False
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(markdown_content))
+
+
+def rscf_renderer() -> Callable[[Tag], str]:
+    renderer = RscfMarkdown("https://rscf.ru")
+    return lambda content: renderer.join(renderer.render_blocks(content))
+
+
+def nauka_renderer() -> Callable[[Tag], str]:
+    renderer = NaukaRfMarkdown("https://xn--80aa3ak5a.xn--p1ai")
+
+    def render(content: Tag) -> str:
+        blocks = []
+        intro = content.find('b')
+        if intro:
+            blocks.append((INTRO, f"**{renderer.inline(intro)}**\n"))
+        return renderer.join(renderer.render_blocks(content, blocks))
+    return render
+
+
+def measure(render: Callable[[Tag], str], content: Tag, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render(content)
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--paragraphs', type=int, nargs='+', default=[200, 1000, 5000],
+                            help="Размеры статей, абзацев")
+    arg_parser.add_argument('--links', type=int, default=4, help="Ссылок в абзаце")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Повторов рендера")
+    args = arg_parser.parse_args()
+
+    cases = [
+        ('rscf', build_rscf_article, legacy_rscf, rscf_renderer()),
+        ('nauka_rf', build_nauka_article, legacy_nauka, nauka_renderer()),
+    ]
+    identical = True
+    for source, build, legacy, render in cases:
+        for paragraphs in args.paragraphs:
+            html = build(paragraphs, args.links)
+            content = BeautifulSoup(html, 'lxml').find('div')
+            same = legacy(content) == render(content)
+            identical = identical and same
+            legacy_time = measure(legacy, content, args.repeat)
+            render_time = measure(render, content, args.repeat)
+            print(f"{source:>8}, {paragraphs:>5} абзацев ({len(html) / 1024:7.1f} КБ): "
+                  f"прежний {legacy_time * 1000:9.2f} мс, однопроходный {render_time * 1000:8.2f} мс "
+                  f"(x{legacy_time / render_time:.1f}){'' if same else ', РЕЗУЛЬТАТЫ РАЗЛИЧАЮТСЯ'}")
+
+    if not identical:
+        print("Результаты однопроходного рендера отличаются от прежнего")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Сравнение пропускной способности NaukaRfParser до и после конвейерной обработки.
+
+Поднимает локальный фейковый сервер наука.рф (AJAX-список, детальные страницы
+и classifier-api с /predict/batch) с искусственной задержкой и прогоняет один и тот же набор
+страниц последовательно (как раньше) и через конвейер заданной ширины.
+
+Запуск из каталога parser:
+    python -m benchmarks.bench_nauka_pipeline --pages 3 --latency 0.05 --width 8
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from aiohttp import web
+
+from models.parsers.nauka_rf import NaukaRfParser
+
+ITEMS_PER_PAGE = 10
+DETAIL_HTML = """
+<html><body>
+<h1 class="u-inner-header__title">{title}</h1>
+<time class="u-news-detail__date">5 апреля 2025</time>
+<div class="u-news-detail-page__text-content">
+<p><b>Вводный абзац новости {n}</b></p>
+<p>Первый абзац текста новости {n}.</p>
+<img-wyz src="/upload/{n}.jpg"></img-wyz>
+<p>Второй абзац текста новости {n}.</p>
+</div>
+</body></html>
+"""
+
+
+def create_app(pages: int, latency: float) -> web.Application:
+    """Создает приложение, имитирующее наука.рф и classifier-api"""
+
+    async def listing(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        page = int(request.query.get('PAGEN_1', 1))
+        items = []
+        if page <= pages:
+            items = [
+                {
+                    'title': f"Новость {page}-{i}",
+                    'url': f"/news/{page}-{i}/",
+                    'date': '5 апреля 2025'
+                }
+                for i in range(ITEMS_PER_PAGE)
+            ]
+        return web.json_response({'ITEMS': items})
+
+    async def detail(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        n = request.match_info['n']
+        html = DETAIL_HTML.format(title=f"Новость {n}", n=n)
+        return web.Response(text=html, content_type='text/html')
+
+    async def predict(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.json_response({'prediction': 'Биология', 'confidence': 0.9, 'model_version': 'bench'})
+
+    async def predict_batch(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        texts = (await request.json()).get('texts') or []
+        return web.json_response({
+            'predictions': [{'prediction': 'Биология', 'confidence': 0.9} for _ in texts],
+            'model_version': 'bench',
+        })
+
+    async def classifier_health(request: web.Request) -> web.Response:
+        return web.json_response({'status': 'OK', 'model_version': 'bench'})
+
+    app = web.Application()
+    app.router.add_get('/news/', listing)
+    app.router.add_get('/news/{n}/', detail)
+    app.router.add_post('/predict', predict)
+    app.router.add_post('/predict/batch', predict_batch)
+    app.router.add_get('/', classifier_health)
+    return app
+
+
+def point_parser_to(parser: NaukaRfParser, base_url: str) -> None:
+    """Направляет парсер на локальный сервер"""
+    parser.base_url = base_url
+    parser.api_url = f"{base_url}/news/?AJAX=Y&PAGEN_1={{}}&period=0"
+    parser.ML_BASE_URL = base_url
+    parser.ML_API_URL = f"{base_url}/predict"
+    parser.ML_BATCH_URL = f"{base_url}/predict/batch"
+
+
+def create_parser(rate_limit: float, **options) -> NaukaRfParser:
+    """Парсер без дисковых кэшей: прогоны не влияют друг на друга и не пишут в JSON_DIR"""
+    return NaukaRfParser(use_http_cache=False, use_category_cache=False, rate_limit=rate_limit, **options)
+
+
+async def run_serial(base_url: str, pages: int, rate_limit: float) -> List[Dict]:
+    """Прежняя схема: новости обрабатываются по одной, классификация и детали - по очереди"""
+    news = []
+    async with create_parser(rate_limit) as parser:
+        point_parser_to(parser, base_url)
+        for page in range(1, pages + 1):
+            for item in await parser._fetch_listing(page):
+                category = await parser._get_category(item['title'])
+                details = await parser.get_news_detail(f"{parser.base_url}{item['url']}")
+                news.append({'title': item['title'], 'category': category, 'details': details})
+    return news
+
+
+async def run_pipeline(base_url: str, pages: int, width: int, rate_limit: float) -> List[Dict]:
+    """Новая схема: конвейер заданной ширины с параллельной классификацией и загрузкой деталей"""
+    async with create_parser(rate_limit, pipeline_width=width) as parser:
+        point_parser_to(parser, base_url)
+        return await parser.get_news(initial_load=True, pages=pages)
+
+
+async def main(pages: int, latency: float, width: int, rate_limit: float) -> None:
+    runner = web.AppRunner(create_app(pages, latency))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        for name, run in (
+            ('последовательно', lambda: run_serial(base_url, pages, rate_limit)),
+            (f"конвейер, ширина {width}", lambda: run_pipeline(base_url, pages, width, rate_limit)),
+        ):
+            started = time.perf_counter()
+            news = await run()
+            duration = time.perf_counter() - started
+            print(f"{name}: {len(news)} новостей за {duration:.2f} сек. "
+                  f"({len(news) / duration:.1f} новостей/сек.)")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--pages', type=int, default=3, help="Количество страниц списка")
+    arg_parser.add_argument('--latency', type=float, default=0.05, help="Задержка ответа сервера, сек.")
+    arg_parser.add_argument('--width', type=int, default=8, help="Ширина конвейера")
+    # Фейковый сайт и classifier-api - один хост: ограничение частоты мерило бы его, а не конвейер
+    arg_parser.add_argument('--rate-limit', type=float, default=0,
+                            help="Запросов в секунду к хосту; 0 - без ограничения")
+    args = arg_parser.parse_args()
+    asyncio.run(main(args.pages, args.latency, args.width, args.rate_limit))
@@ -0,0 +1,131 @@
+"""
+Масштабирование разбора детальных страниц по числу процессов пула.
+
+Детальные страницы источника берутся из корпуса фикстур. Для каждого
+размера пула имитируется обход: concurrency задач по очереди "загружают"
+страницу (asyncio.sleep на latency) и разбирают ее через BaseParser._parse_detail.
+Выводит страниц/сек. и задержку цикла событий (насколько опаздывает таймер
+в 10 мс), проверяет, что результат совпадает с разбором в цикле событий.
+
+Запуск из каталога parser:
+    python -m benchmarks.bench_parse_pool --source rscf --workers 0 1 2 4 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.fixtures import FIXTURES_DIR, FixtureCorpus
+from models.parser_factory import ParserFactory
+from utils.ingestion_client import percentile
+from utils.parse_pool import close_parse_pool, get_parse_pool
+
+TICK = 0.01  # Период таймера, по опозданию которого измеряется задержка цикла событий
+
+
+def load_detail_pages(corpus: FixtureCorpus, source: str) -> List[str]:
+    """Детальные страницы источника: HTML-ответы 200 на адреса без параметров"""
+    pages = []
+    for url, entry in corpus.entries.items():
+        if entry['source'] != source or entry['status'] != 200 or '?' in url:
+            continue
+        if 'html' not in (entry.get('content_type') or ''):
+            continue
+        pages.append(corpus.body(entry).decode('utf-8', errors='replace'))
+    return pages
+
+
+async def measure_lag(stop: asyncio.Event, lags: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def run_crawl(parser, pages: List[str], repeat: int, concurrency: int, latency: float) -> Dict:
+    """Имитирует обход: загрузка (sleep) и разбор каждой страницы repeat раз"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(repeat):
+        for index, html in enumerate(pages):
+            queue.put_nowait((index, html))
+    results: Dict[int, Dict] = {}
+
+    async def worker() -> None:
+        while not queue.empty():
+            index, html = queue.get_nowait()
+            if latency:
+                await asyncio.sleep(latency)
+            results[index] = await parser._parse_detail(html)
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    lag_task = asyncio.create_task(measure_lag(stop, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+    stop.set()
+    await lag_task
+
+    return {
+        'duration': duration,
+        'pages': repeat * len(pages),
+        'lag_p99': percentile(lags, 0.99),
+        'lag_max': max(lags, default=0.0),
+        'results': results,
+    }
+
+
+async def run_workers(source: str, workers: int, pages: List[str], args) -> Dict:
+    parser = ParserFactory.get_parser_class(source)(parse_workers=workers)
+    pool = get_parse_pool(workers)
+    if pool is not None:
+        # Запуск процессов и импорты в них не входят в замер
+        await asyncio.gather(*(parser._parse_detail(pages[0]) for _ in range(workers * 2)))
+    try:
+        return await run_crawl(parser, pages, args.repeat, args.concurrency, args.latency)
+    finally:
+        close_parse_pool()
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--corpus', default=FIXTURES_DIR, help="Каталог корпуса фикстур")
+    arg_parser.add_argument('--source', default='rscf', help="Источник")
+    arg_parser.add_argument('--workers', type=int, nargs='+',
+                            default=sorted({0, 1, 2, 4, os.cpu_count() or 1}),
+                            help="Размеры пула (0 - разбор в цикле событий)")
+    arg_parser.add_argument('--repeat', type=int, default=20, help="Сколько раз разобрать каждую страницу")
+    arg_parser.add_argument('--concurrency', type=int, default=16, help="Одновременных загрузок")
+    arg_parser.add_argument('--latency', type=float, default=0.0, help="Имитация задержки сети, сек.")
+    args = arg_parser.parse_args()
+
+    pages = load_detail_pages(FixtureCorpus(args.corpus), args.source)
+    if not pages:
+        print(f"В корпусе {args.corpus} нет детальных страниц источника {args.source}")
+        return 1
+    print(f"{args.source}: {len(pages)} страниц x {args.repeat}, ядер: {os.cpu_count()}")
+
+    reference = None
+    baseline = None
+    identical = True
+    for workers in args.workers:
+        report = asyncio.run(run_workers(args.source, workers, pages, args))
+        if reference is None:
+            reference = report['results']
+        identical = identical and report['results'] == reference
+        throughput = report['pages'] / report['duration']
+        baseline = baseline or throughput
+        print(f"  процессов {workers:>2}: {throughput:8.1f} страниц/сек. (x{throughput / baseline:.2f}), "
+              f"задержка цикла событий p99 {report['lag_p99'] * 1000:6.1f} мс, "
+              f"макс. {report['lag_max'] * 1000:6.1f} мс")
+
+    if not identical:
+        print("Результаты разбора в пуле отличаются от разбора в цикле событий")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
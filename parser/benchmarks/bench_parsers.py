@@ -0,0 +1,175 @@
+"""
+Бенчмарк пропускной способности парсеров на корпусе фикстур.
+
+Поднимает сервер воспроизведения (benchmarks/replay_server.py) и для каждого
+источника из ParserFactory в отдельном процессе запускает process_news_source
+с чистым состоянием (первичная загрузка всех записанных страниц).
+Выводит страниц/сек., новостей/сек., p50/p99 задержки по этапам и пиковый RSS.
+
+Запуск из каталога parser:
+    python -m benchmarks.record_fixtures --pages 5     # один раз, нужен доступ к сайтам
+    python -m benchmarks.bench_parsers --latency 0.05 --error-rate 0.01
+    python -m benchmarks.bench_parsers --sink sqlite    # без заглушки API, в локальную SQLite
+    python -m benchmarks.bench_parsers --rate-limit 20  # с ограничением частоты, как в работе
+"""
+import argparse
+import asyncio
+import functools
+import inspect
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from benchmarks.fixtures import FIXTURES_DIR, FixtureCorpus
+from benchmarks.replay_server import create_replay_app, start_replay_server
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[int(q * (len(ordered) - 1))] if ordered else 0.0
+
+
+def instrument(owner, name: str, stage: str, timings: Dict[str, List[float]]) -> None:
+    """Оборачивает метод или функцию owner.name замером времени этапа stage"""
+    original = getattr(owner, name)
+
+    if inspect.iscoroutinefunction(original):
+        @functools.wraps(original)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await original(*args, **kwargs)
+            finally:
+                timings[stage].append(time.perf_counter() - started)
+    else:
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                timings[stage].append(time.perf_counter() - started)
+
+    setattr(owner, name, wrapper)
+
+
+def run_source(source: str, replay_base_url: str, pages: int, sink: str = 'api', rate_limit: float = 0.0) -> Dict:
+    """Прогоняет один источник в текущем (дочернем) процессе и возвращает отчет"""
+    json_dir = tempfile.mkdtemp(prefix=f"bench_{source}_")
+    # Настройки читаются config.py при импорте, поэтому задаются до него
+    os.environ['PARSER_REPLAY_URL'] = replay_base_url
+    os.environ['PARSER_API_URL'] = f"{replay_base_url}/api-dev/news/"
+    os.environ['PARSER_JSON_DIR'] = json_dir
+    os.environ['PARSER_INGEST_BACKEND'] = sink
+    os.environ['PARSER_LOCAL_DB_PATH'] = os.path.join(json_dir, 'news.sqlite3')
+    os.environ['PARSER_HTTP_RATE_LIMIT'] = str(rate_limit)
+
+    import main
+    from models.parser_factory import ParserFactory
+
+    main.AMOUNT_PAGES = pages
+    timings: Dict[str, List[float]] = defaultdict(list)
+    sent = []
+
+    parser_class = ParserFactory.get_parser_class(source)
+    instrument(parser_class, '_fetch_listing', 'listing', timings)
+    instrument(parser_class, 'get_news_detail', 'detail', timings)
+    instrument(parser_class, '_parse_detail', 'parse', timings)
+    if hasattr(parser_class, '_get_category'):
+        instrument(parser_class, '_get_category', 'classify', timings)
+
+    send_to_database = main.send_to_database
+
+    async def counting_send(items: list) -> bool:
+        sent.extend(items)
+        return await send_to_database(items)
+
+    main.send_to_database = counting_send
+    instrument(main, 'send_to_database', 'send', timings)
+
+    async def run() -> None:
+        await main.process_news_source(source)
+        await main.close_ingestion()
+        main.close_parse_pool()
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    duration = time.perf_counter() - started
+    shutil.rmtree(json_dir, ignore_errors=True)
+
+    return {
+        'source': source,
+        'duration': duration,
+        'pages': len(timings['listing']),
+        'items': len(sent),
+        'stages': {
+            stage: {
+                'count': len(samples),
+                'p50': percentile(samples, 0.5),
+                'p99': percentile(samples, 0.99),
+            }
+            for stage, samples in timings.items()
+        },
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def print_report(report: Dict) -> None:
+    duration = report['duration']
+    print(f"\n[{report['source']}] {duration:.2f} сек., "
+          f"{report['pages'] / duration:.2f} страниц/сек., "
+          f"{report['items'] / duration:.2f} новостей/сек., "
+          f"пиковый RSS {report['peak_rss_mb']:.1f} МБ")
+    for stage, stats in report['stages'].items():
+        print(f"    {stage:>9}: {stats['count']:>5} вызовов, "
+              f"p50 {stats['p50'] * 1000:8.2f} мс, p99 {stats['p99'] * 1000:8.2f} мс")
+
+
+async def main(args) -> None:
+    corpus = FixtureCorpus(args.corpus)
+    if not corpus.entries:
+        print(f"Корпус {args.corpus} пуст: сначала запустите benchmarks.record_fixtures")
+        return
+
+    app = create_replay_app(
+        corpus,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        classifier_latency=args.classifier_latency,
+    )
+    runner, base_url = await start_replay_server(app)
+    loop = asyncio.get_running_loop()
+
+    try:
+        sources = args.source or list(corpus.meta)
+        for source in sources:
+            pages = corpus.meta.get(source, {}).get('pages', 1)
+            # Каждый источник - в своем процессе, чтобы RSS и импорты не смешивались
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                report = await loop.run_in_executor(pool, run_source, source, base_url, pages, args.sink, args.rate_limit)
+            print_report(report)
+        print(f"\nСервер воспроизведения: {app['stats']}")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--corpus', default=FIXTURES_DIR, help="Каталог корпуса фикстур")
+    arg_parser.add_argument('--source', action='append', help="Источник (по умолчанию - все из корпуса)")
+    arg_parser.add_argument('--latency', type=float, default=0.0, help="Задержка ответа, сек.")
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help="Случайная добавка к задержке, сек.")
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help="Доля ответов 503")
+    arg_parser.add_argument('--sink', choices=['api', 'sqlite'], default='api',
+                            help="Куда отправлять новости: заглушка API или локальная SQLite")
+    arg_parser.add_argument('--rate-limit', type=float, default=0.0,
+                            help="Запросов в секунду к одному хосту (0 - без ограничения)")
+    arg_parser.add_argument('--classifier-latency', type=float, default=0.0, help="Задержка заглушки classifier-api, сек.")
+    asyncio.run(main(arg_parser.parse_args()))
@@ -0,0 +1,79 @@
+"""
+Проверка рендера детальных страниц в markdown по эталонам.
+
+Для каждой страницы benchmarks/golden_markdown/{источник}_*.html результат
+parse_news_detail каждым бэкендом разбора сравнивается с эталоном из
+соседнего .json. Завершается с кодом 1 при любом расхождении.
+
+Запуск из каталога parser:
+    python -m benchmarks.check_markdown
+    python -m benchmarks.check_markdown --update   # перезаписать эталоны
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+
+from models.extraction import BACKENDS, get_backend
+from models.parser_factory import ParserFactory
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_markdown')
+
+
+def source_of(name: str) -> str:
+    """Источник страницы по префиксу имени файла"""
+    for source in ParserFactory.sources():
+        if name.startswith(f"{source}_"):
+            return source
+    raise ValueError(f"Не удалось определить источник страницы {name}")
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--golden-dir', default=GOLDEN_DIR, help="Каталог эталонов")
+    arg_parser.add_argument('--update', action='store_true', help="Перезаписать эталоны текущим результатом")
+    args = arg_parser.parse_args()
+
+    pages = sorted(glob.glob(os.path.join(args.golden_dir, '*.html')))
+    if not pages:
+        print(f"В каталоге {args.golden_dir} нет HTML-страниц")
+        return 1
+
+    failures = 0
+    for path in pages:
+        name = os.path.splitext(os.path.basename(path))[0]
+        golden_path = os.path.join(args.golden_dir, f"{name}.json")
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        parser = ParserFactory.get_parser(source_of(name))
+
+        if args.update:
+            parser.extractor = get_backend('html.parser')
+            with open(golden_path, 'w', encoding='utf-8') as f:
+                json.dump(parser.parse_news_detail(html), f, ensure_ascii=False, indent=2)
+                f.write('\n')
+            print(f"{name}: эталон обновлен")
+            continue
+
+        with open(golden_path, 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+        for backend in BACKENDS:
+            parser.extractor = get_backend(backend)
+            result = parser.parse_news_detail(html)
+            if result == expected:
+                continue
+            failures += 1
+            print(f"{name} [{backend}]: расхождение с эталоном")
+            for key in sorted(set(expected) | set(result or {})):
+                actual = (result or {}).get(key)
+                if actual != expected.get(key):
+                    print(f"    {key}:\n      ожидалось {expected.get(key)!r}\n      получено  {actual!r}")
+
+    if not args.update:
+        print(f"Страниц: {len(pages)}, расхождений: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
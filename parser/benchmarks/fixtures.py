@@ -0,0 +1,64 @@
+"""
+Корпус записанных ответов сайтов-источников.
+
+Структура каталога:
+    index.json             - url -> {source, status, content_type, path}
+    <source>/<hash>.html   - тела ответов (.json для AJAX-списков)
+"""
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class FixtureCorpus:
+    """Набор записанных HTTP-ответов с индексом по исходному URL"""
+
+    def __init__(self, root: str = FIXTURES_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+        self.entries: Dict[str, Dict] = {}
+        self.meta: Dict[str, Dict] = {}  # Сведения об источниках: сколько страниц записано и т.п.
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('entries', {})
+            self.meta = data.get('meta', {})
+
+    def recorder(self, source: str):
+        """Возвращает функцию записи ответов для BaseParser.recorder"""
+        def record(url: str, status: int, content_type: str, body: bytes) -> None:
+            self.record(source, url, status, content_type, body)
+        return record
+
+    def record(self, source: str, url: str, status: int, content_type: str, body: bytes) -> None:
+        """Сохраняет тело ответа и добавляет его в индекс"""
+        extension = 'json' if 'json' in (content_type or '') else 'html'
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+        path = os.path.join(source, f"{name}.{extension}")
+
+        os.makedirs(os.path.join(self.root, source), exist_ok=True)
+        with open(os.path.join(self.root, path), 'wb') as f:
+            f.write(body)
+
+        self.entries[url] = {
+            'source': source,
+            'status': status,
+            'content_type': content_type,
+            'path': path,
+        }
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        return self.entries.get(url)
+
+    def body(self, entry: Dict) -> bytes:
+        with open(os.path.join(self.root, entry['path']), 'rb') as f:
+            return f.read()
+
+    def save(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump({'meta': self.meta, 'entries': self.entries}, f, ensure_ascii=False, indent=2)
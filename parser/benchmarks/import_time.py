@@ -0,0 +1,92 @@
+"""
+Отчет о времени импорта и проверка бюджета холодного старта парсера.
+
+Для каждого источника в чистом процессе выполняет `import main` и загрузку
+класса парсера из ParserFactory под `python -X importtime`, суммирует время
+по пакетам верхнего уровня и завершается с кодом 1, если холодный старт
+(лучший из --repeat запусков) дольше --budget секунд.
+
+Запуск из каталога parser:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --source rscf --budget 0.8 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+PARSER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Бюджет холодного старта по умолчанию, сек.
+DEFAULT_BUDGET = 1.0
+
+COLD_START = (
+    "import main\n"
+    "from models.parser_factory import ParserFactory\n"
+    "ParserFactory.get_parser_class({source!r})\n"
+)
+
+
+def measure(source: str) -> Tuple[float, Dict[str, float]]:
+    """Запускает холодный старт в отдельном процессе: (время импорта, сек.; время по пакетам)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', COLD_START.format(source=source)],
+        cwd=PARSER_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Холодный старт {source} завершился ошибкой:\n{result.stderr}")
+
+    total = 0.0
+    packages: Dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        # Формат: "import time: <self, мкс> | <cumulative, мкс> | <имя модуля>"
+        if not line.startswith('import time:'):
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        if not self_time.strip().isdigit():
+            continue  # Строка заголовка
+        seconds = int(self_time) / 1_000_000
+        total += seconds
+        packages[name.strip().split('.')[0]] += seconds
+    return total, packages
+
+
+def print_report(source: str, total: float, packages: Dict[str, float], top: int) -> None:
+    print(f"\n[{source}] время импорта: {total * 1000:.1f} мс")
+    for name, seconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"    {name:<24} {seconds * 1000:8.1f} мс  {seconds / total:6.1%}")
+
+
+def main(sources: List[str], repeat: int, budget: float, top: int) -> int:
+    failed = False
+    for source in sources:
+        # Лучший из запусков отсекает шум от занятого диска и CPU
+        runs = [measure(source) for _ in range(repeat)]
+        total, packages = min(runs, key=lambda run: run[0])
+        print_report(source, total, packages, top)
+        if total > budget:
+            print(f"    ПРЕВЫШЕН бюджет холодного старта: {total:.3f} > {budget:.3f} сек.")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--source', action='append', help="Источник (по умолчанию - все из ParserFactory)")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="Сколько раз повторить замер")
+    arg_parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help="Бюджет холодного старта, сек.")
+    arg_parser.add_argument('--top', type=int, default=10, help="Сколько пакетов показать в отчете")
+    args = arg_parser.parse_args()
+
+    if args.source:
+        sources = args.source
+    else:
+        sys.path.insert(0, PARSER_DIR)
+        from models.parser_factory import ParserFactory
+        sources = ParserFactory.sources()
+
+    sys.exit(main(sources, args.repeat, args.budget, args.top))
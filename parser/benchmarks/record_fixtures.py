@@ -0,0 +1,45 @@
+"""
+Запись корпуса фикстур с настоящих сайтов-источников.
+
+Прогоняет парсер каждого источника по первым страницам списка и сохраняет
+все полученные страницы списка, AJAX-ответы и детальные страницы.
+
+Запуск из каталога parser:
+    python -m benchmarks.record_fixtures --pages 5
+    python -m benchmarks.record_fixtures --pages 5 --source rscf --out /tmp/fixtures
+"""
+import argparse
+import asyncio
+
+from benchmarks.fixtures import FIXTURES_DIR, FixtureCorpus
+from models.parser_factory import ParserFactory
+
+
+async def record_source(corpus: FixtureCorpus, source: str, pages: int) -> None:
+    parser = ParserFactory.get_parser(source)
+    parser.use_http_cache = False  # Нужны полные тела ответов, а не 304
+    parser.recorder = corpus.recorder(source)
+
+    async with parser:
+        news = await parser.get_news(initial_load=True, pages=pages)
+
+    recorded = sum(1 for entry in corpus.entries.values() if entry['source'] == source)
+    corpus.meta[source] = {'pages': pages, 'items': len(news)}
+    print(f"[{source}] записано ответов: {recorded}, новостей: {len(news)}")
+
+
+async def main(sources: list, pages: int, out: str) -> None:
+    corpus = FixtureCorpus(out)
+    for source in sources:
+        await record_source(corpus, source, pages)
+    corpus.save()
+    print(f"Корпус сохранен в {out}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--pages', type=int, default=5, help="Сколько страниц списка записать")
+    arg_parser.add_argument('--source', action='append', help="Источник (по умолчанию - все из ParserFactory)")
+    arg_parser.add_argument('--out', default=FIXTURES_DIR, help="Каталог корпуса")
+    args = arg_parser.parse_args()
+    asyncio.run(main(args.source or ParserFactory.sources(), args.pages, args.out))
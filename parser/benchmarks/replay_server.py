@@ -0,0 +1,124 @@
+"""
+Локальный сервер воспроизведения корпуса фикстур.
+
+Отдает записанные ответы по адресам вида /{scheme}/{host}/{path}?{query}
+(так их переписывает BaseParser при заданном PARSER_REPLAY_URL), отвечает
+заглушками на запросы к classifier-api (/.../predict и /.../predict/batch)
+и к API бэкенда (/api-dev/news/), добавляет задержку и случайные ошибки.
+
+Запуск из каталога parser:
+    python -m benchmarks.replay_server --port 8099 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+
+from aiohttp import web
+
+from benchmarks.fixtures import FIXTURES_DIR, FixtureCorpus
+
+
+def create_replay_app(
+    corpus: FixtureCorpus,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    classifier_latency: float = 0.0,
+    model_version: str = 'replay',
+) -> web.Application:
+    """Создает приложение, воспроизводящее корпус фикстур"""
+    app = web.Application()
+    app['stats'] = {'served': 0, 'missing': 0, 'errors': 0, 'predict': 0, 'predict_batch': 0, 'ingest': 0}
+
+    async def delay(base: float) -> None:
+        pause = base + random.uniform(0, jitter)
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    async def replay(request: web.Request) -> web.Response:
+        stats = request.app['stats']
+        await delay(latency)
+
+        if error_rate and random.random() < error_rate:
+            stats['errors'] += 1
+            return web.Response(status=503, text="Injected error")
+
+        scheme, _, rest = request.match_info['tail'].partition('/')
+        url = f"{scheme}://{rest}"
+        if request.query_string:
+            url = f"{url}?{request.query_string}"
+
+        entry = corpus.lookup(url)
+        if not entry:
+            stats['missing'] += 1
+            return web.Response(status=404, text=f"No fixture for {url}")
+
+        stats['served'] += 1
+        return web.Response(
+            status=entry['status'],
+            body=corpus.body(entry),
+            content_type=entry['content_type'],
+        )
+
+    async def predict(request: web.Request) -> web.Response:
+        request.app['stats']['predict'] += 1
+        await delay(classifier_latency)
+        return web.json_response({'prediction': 'Новости Фонда', 'confidence': 1.0, 'model_version': model_version})
+
+    async def predict_batch(request: web.Request) -> web.Response:
+        request.app['stats']['predict_batch'] += 1
+        texts = (await request.json()).get('texts') or []
+        await delay(classifier_latency)
+        return web.json_response({
+            'predictions': [{'prediction': 'Новости Фонда', 'confidence': 1.0} for _ in texts],
+            'model_version': model_version,
+        })
+
+    async def classifier_health(request: web.Request) -> web.Response:
+        return web.json_response({'status': 'OK', 'model_version': model_version})
+
+    async def ingest(request: web.Request) -> web.Response:
+        request.app['stats']['ingest'] += 1
+        await request.read()
+        return web.json_response([], status=201)
+
+    app.router.add_post('/api-dev/news/', ingest)
+    app.router.add_post('/{tail:.*/predict}', predict)
+    app.router.add_post('/{tail:.*/predict/batch}', predict_batch)
+    app.router.add_get('/{scheme}/{host:classifier-api[^/]*}/', classifier_health)
+    app.router.add_get('/{tail:.*}', replay)
+    return app
+
+
+async def start_replay_server(app: web.Application, host: str = '127.0.0.1', port: int = 0):
+    """Запускает сервер и возвращает (runner, базовый URL)"""
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--corpus', default=FIXTURES_DIR, help="Каталог корпуса фикстур")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8099)
+    arg_parser.add_argument('--latency', type=float, default=0.0, help="Задержка ответа, сек.")
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help="Случайная добавка к задержке, сек.")
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help="Доля ответов 503")
+    arg_parser.add_argument('--classifier-latency', type=float, default=0.0, help="Задержка заглушки classifier-api, сек.")
+    args = arg_parser.parse_args()
+
+    web.run_app(
+        create_replay_app(
+            FixtureCorpus(args.corpus),
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            classifier_latency=args.classifier_latency,
+        ),
+        host=args.host,
+        port=args.port,
+    )
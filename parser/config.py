@@ -2,6 +2,19 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 JSON_FILE = os.path.join(BASE_DIR, 'rscf_news.json')
+# Каталог для состояния парсера (монтируется как volume в docker-compose)
+JSON_DIR = os.getenv('PARSER_JSON_DIR', os.path.join(BASE_DIR, 'json_objects'))
+# Режим журнала SQLite-хранилищ (ссылки, журнал отправки, кэши, индекс дубликатов).
+# WAL быстрее, но требует общей памяти и работает только на одной машине. Если JSON_DIR -
+# общий каталог нескольких машин (daemon.py с общим LEASE_PATH), нужен DELETE
+SQLITE_JOURNAL_MODE = os.getenv('PARSER_SQLITE_JOURNAL_MODE', 'WAL').upper()
+
+# Адрес API бэкенда, принимающего новости от парсера
+API_URL = os.getenv('PARSER_API_URL', 'http://djangoapp:8000/api-dev/news/')
+
+# Адрес сервера воспроизведения записанных ответов (benchmarks/replay_server.py).
+# Если задан, все запросы парсеров уходят на него вместо настоящих сайтов
+HTTP_REPLAY_URL = os.getenv('PARSER_REPLAY_URL')
 
 # Словарь для преобразования русских названий месяцев
 MONTHS = {
@@ -20,4 +33,126 @@ MONTHS = {
 }
 
 # Количсетсво страниц для парсинга с ресурсов
-AMOUNT_PAGES = 400
\ No newline at end of file
+AMOUNT_PAGES = 400
+
+# Настройки общего пула HTTP-соединений парсеров
+HTTP_POOL_LIMIT = 100  # Всего одновременных соединений
+HTTP_POOL_LIMIT_PER_HOST = 10  # Одновременных соединений на один хост
+HTTP_DNS_CACHE_TTL = 300  # Время жизни DNS-кэша, сек.
+HTTP_KEEPALIVE_TIMEOUT = 30  # Время удержания простаивающего соединения, сек.
+HTTP_TIMEOUT = 30  # Общий таймаут запроса, сек.
+
+# Настройки планировщика обхода страниц
+CRAWL_PAGE_WINDOW = 8  # Сколько страниц списка загружается наперед
+CRAWL_DETAIL_WORKERS = 16  # Размер общего пула загрузки детальных страниц
+CRAWL_INITIAL_CONCURRENCY = 4  # Стартовое число параллельных запросов к одному хосту
+CRAWL_MIN_CONCURRENCY = 1  # Минимальное число параллельных запросов к одному хосту
+CRAWL_TARGET_LATENCY = 2.0  # Задержка ответа, выше которой параллельность снижается, сек.
+
+# Сколько новостей наука.рф обрабатывается одновременно (классификация + детали)
+NAUKA_PIPELINE_WIDTH = 8
+
+# Дисковый кэш условных запросов (ETag/Last-Modified и хэш тела ответа)
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_PATH = os.path.join(JSON_DIR, 'http_cache.sqlite3')
+
+# Дисковый LRU-кэш категорий заголовков; сбрасывается при смене версии модели classifier-api
+CATEGORY_CACHE_ENABLED = True
+CATEGORY_CACHE_PATH = os.path.join(JSON_DIR, 'category_cache.sqlite3')
+CATEGORY_CACHE_SIZE = 50000  # Записей, сверх них вытесняются давно не использованные
+
+# Бэкенд разбора HTML: 'lxml' (быстрый) или 'html.parser' (запасной, без зависимостей)
+EXTRACTION_BACKEND = 'lxml'
+
+# Инкрементальный обход: остановка после стольких уже обработанных новостей подряд
+INCREMENTAL_KNOWN_RUN = 5
+# Предел страниц списка для одного инкрементального обхода
+INCREMENTAL_MAX_PAGES = 20
+
+# Хранилище обработанных ссылок
+LINK_STORE_PATH = os.path.join(JSON_DIR, 'processed_links.sqlite3')
+
+# Источники, которые обрабатываются при запуске парсера
+SOURCES = ['rscf', 'nauka_rf']
+# Файл с настройками источников (utils/sources.py); если его нет, используются SOURCES и DAEMON_INTERVALS
+SOURCES_FILE = os.getenv('PARSER_SOURCES_FILE', os.path.join(BASE_DIR, 'sources.json'))
+
+# Настройки фонового режима (daemon.py)
+DAEMON_INTERVAL = 120  # Интервал между циклами обработки источника, сек.
+DAEMON_INTERVALS = {}  # Интервалы для отдельных источников, например {'nauka_rf': 300}
+DAEMON_SHUTDOWN_TIMEOUT = 30  # Сколько ждать завершения текущих циклов при остановке, сек.
+
+# Очередь отправки новостей в бэкенд (utils/ingestion.py)
+INGEST_BATCH_SIZE = 10  # Новостей в одном запросе
+INGEST_MAX_AGE = 5.0  # Максимальное время ожидания неполного пакета, сек.
+INGEST_QUEUE_SIZE = 100  # Размер очереди; при заполнении парсер ждет отправителей
+INGEST_SENDERS = 2  # Количество параллельных отправителей
+
+# Клиент API приема новостей (utils/ingestion_client.py)
+INGEST_TIMEOUT = 30  # Таймаут одного запроса, сек.
+INGEST_RETRIES = 4  # Повторов после первой неудачной попытки
+INGEST_BACKOFF_BASE = 0.5  # Базовая задержка перед повтором, сек. (удваивается с каждой попыткой)
+INGEST_BACKOFF_MAX = 30.0  # Максимальная задержка перед повтором, сек.
+INGEST_GZIP_LEVEL = 6  # Уровень сжатия тела запроса (0 - без сжатия)
+INGEST_GZIP_MIN_SIZE = 1024  # Тела меньше этого размера (байт) не сжимаются
+INGEST_LATENCY_SAMPLES = 1000  # Сколько последних задержек отправки хранится для p50/p99
+
+# Журнал неподтвержденных пакетов (utils/outbox.py)
+OUTBOX_PATH = os.path.join(JSON_DIR, 'outbox.sqlite3')
+OUTBOX_REPLAY_BATCH_SIZE = 100  # Новостей в одном запросе при повторной отправке
+OUTBOX_MAX_ATTEMPTS = 20  # После стольких неудачных попыток пакет больше не отправляется
+
+# NDJSON-снимки полученных новостей (utils/snapshot.py)
+SNAPSHOT_DIR = os.path.join(JSON_DIR, 'snapshots')
+SNAPSHOT_COMPRESSION = 'gzip'  # 'none', 'gzip' или 'zstd' (нужен пакет zstandard)
+SNAPSHOT_ROTATE_BYTES = 64 * 1024 * 1024  # Новый файл после стольких байт NDJSON
+SNAPSHOT_ROTATE_SECONDS = 24 * 60 * 60  # Новый файл не реже раза в сутки
+
+# Куда отправляются новости: 'api' - бэкенд (API_URL), 'sqlite' - локальная база
+# LOCAL_DB_PATH (для работы и бенчмарков без Django и MySQL)
+INGEST_BACKEND = os.getenv('PARSER_INGEST_BACKEND', 'api')
+LOCAL_DB_PATH = os.getenv('PARSER_LOCAL_DB_PATH', os.path.join(BASE_DIR, 'rscf_news.sqlite3'))
+
+# Датасет для обучения классификатора (utils/dataset_export.py)
+DATASET_CSV_PATH = os.path.join(BASE_DIR, 'news_dataset.csv')
+DATASET_PARQUET_PATH = os.path.join(BASE_DIR, 'news_dataset.parquet')
+DATASET_CHUNK_SIZE = 5000  # Строк, читаемых из базы за раз
+
+# Поиск почти-дубликатов между источниками (utils/dedup.py)
+DEDUP_ENABLED = True
+DEDUP_PATH = os.path.join(JSON_DIR, 'dedup.sqlite3')
+DEDUP_MAX_DISTANCE = 3  # Максимальное расстояние Хэмминга между отпечатками дубликатов
+DEDUP_WINDOW_DAYS = 30  # Сколько дней помнить отпечатки
+DEDUP_REFRESH_INTERVAL = 10.0  # Как часто подгружать отпечатки других процессов, сек.
+
+# Метрики этапов парсера (utils/metrics.py)
+METRICS_HOST = os.getenv('PARSER_METRICS_HOST', '0.0.0.0')
+METRICS_PORT = int(os.getenv('PARSER_METRICS_PORT', '9108'))  # /metrics в фоновом режиме; 0 - не запускать
+METRICS_JSON_PATH = os.path.join(JSON_DIR, 'metrics.json')  # Снимок метрик после разового запуска
+
+# Политика запросов к сайтам (utils/http_policy.py)
+HTTP_RATE_LIMIT = float(os.getenv('PARSER_HTTP_RATE_LIMIT', '20'))  # Запросов в секунду к одному хосту; 0 - без ограничения
+HTTP_RATE_BURST = 10  # Сколько запросов к хосту можно отправить подряд без ожидания
+HTTP_HOST_RATE_LIMITS = {}  # Частота для отдельных хостов, например {'rscf.ru': 5}
+HTTP_RETRIES = 3  # Повторов GET-запроса после ошибки соединения, таймаута, 429 или 5xx
+HTTP_BACKOFF_BASE = 0.5  # Базовая задержка перед повтором, сек. (удваивается с каждой попыткой)
+HTTP_BACKOFF_MAX = 30.0  # Максимальная задержка перед повтором, сек.
+HTTP_BREAKER_THRESHOLD = 10  # Ошибок подряд, после которых хост приостанавливается
+HTTP_BREAKER_COOLDOWN = 30.0  # На сколько приостанавливается хост, сек.
+HTTP_BREAKER_MAX_COOLDOWN = 600.0  # Предел паузы при повторных неудачах пробного запроса, сек.
+
+# Пул процессов для разбора детальных страниц (utils/parse_pool.py); 0 - разбор в цикле событий.
+# По умолчанию одно ядро остается циклу событий: на одноядерной машине пул только добавляет накладные расходы
+PARSE_WORKERS = int(os.getenv('PARSER_PARSE_WORKERS', str(max(0, min(4, (os.cpu_count() or 1) - 1)))))
+
+# Контрольная точка первичной загрузки (utils/checkpoint.py)
+CHECKPOINT_INTERVAL = 5.0  # Как часто сохраняются завершенные страницы, сек.
+
+# Распределение источников между процессами (daemon.py)
+DAEMON_WORKERS = int(os.getenv('PARSER_WORKERS', '1'))  # Процессов-обработчиков на этой машине
+DAEMON_MAX_SOURCES = int(os.getenv('PARSER_MAX_SOURCES', '0'))  # Источников на процесс; 0 - поровну между DAEMON_WORKERS
+# Общий для всех машин файл аренды. Несколько машин должны делить весь JSON_DIR
+# и работать с PARSER_SQLITE_JOURNAL_MODE=DELETE, иначе новый владелец источника не увидит его состояние
+LEASE_PATH = os.getenv('PARSER_LEASE_PATH', os.path.join(JSON_DIR, 'leases.sqlite3'))
+LEASE_TTL = 60.0  # Срок аренды источника, сек.; процесс, не продливший аренду, теряет источник
+LEASE_RENEW_INTERVAL = 10.0  # Как часто продлеваются аренды и ищутся свободные источники, сек.
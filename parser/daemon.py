@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import time
+from typing import Dict, Optional, Tuple
+
+from main import run_cycle  # Импорт main также настраивает логирование
+from models.parser_factory import ParserFactory
+from config import (
+    DAEMON_SHUTDOWN_TIMEOUT,
+    DAEMON_WORKERS,
+    DAEMON_MAX_SOURCES,
+    DEDUP_ENABLED,
+    LEASE_TTL,
+    LEASE_RENEW_INTERVAL,
+    METRICS_HOST,
+    METRICS_PORT,
+)
+from utils.database import close_ingestion
+from utils.dedup import DuplicateIndex
+from utils.leases import LeaseStore
+from utils.link_store import LinkStore
+from utils.metrics import CYCLE_SECONDS, stage_summary, start_metrics_server
+from utils.outbox import Outbox
+from utils.parse_pool import close_parse_pool
+from utils.snapshot import SnapshotWriter
+from utils.sources import SourceConfig, load_sources
+
+logger = logging.getLogger(__name__)
+
+
+async def run_source_forever(
+    config: SourceConfig,
+    stop: asyncio.Event,
+    dedup: Optional[DuplicateIndex] = None
+) -> None:
+    """
+    Обрабатывает источник циклами с интервалом из его настроек.
+    Парсер, его HTTP-сессия и хранилище ссылок открываются один раз на весь
+    срок работы процесса, поэтому цикл стоит только сетевой работы.
+    """
+    source = config.name
+    interval = config.interval
+    parser = ParserFactory.get_parser(source, **config.options)
+    parser.dedup = dedup  # Общий индекс: дубликаты новостей других источников пропускаются
+    processed_links = LinkStore(source)
+    outbox = Outbox(source)
+    snapshot = SnapshotWriter(source)
+    try:
+        async with parser:
+            while not stop.is_set():
+                started = time.monotonic()
+                try:
+                    await run_cycle(source, parser, processed_links, outbox, snapshot)
+                except Exception as e:
+                    logger.error(f"[{source}] Ошибка: {str(e)}")
+
+                duration = time.monotonic() - started
+                CYCLE_SECONDS.observe(duration, parser.source_name)
+                logger.info(f"[{source}] Цикл завершен за {duration:.2f} сек.")
+                logger.info(f"[{source}] Время по этапам с запуска: {stage_summary(parser.source_name)}")
+
+                # Ждем следующего цикла, но просыпаемся сразу при остановке
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=max(0.0, interval - duration))
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        processed_links.close()
+        outbox.close()
+        snapshot.close()
+
+
+async def main(worker_id: int = 0) -> None:
+    """
+    Процесс-обработчик: берет в аренду свободные источники (не больше
+    max_sources) и обрабатывает их в одном цикле событий до сигнала остановки.
+    Аренды продлеваются каждые LEASE_RENEW_INTERVAL секунд; источник, аренду
+    которого забрал другой процесс, сразу останавливается.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    sources = load_sources()
+    max_sources = DAEMON_MAX_SOURCES or math.ceil(len(sources) / max(1, DAEMON_WORKERS))
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    leases = LeaseStore()
+
+    # Метрики этапов отдаются Prometheus на /metrics; у каждого процесса свой порт
+    metrics_runner = None
+    if METRICS_PORT:
+        try:
+            metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT + worker_id)
+        except OSError as e:
+            logger.error(f"Не удалось запустить сервер метрик: {e}")
+
+    # Индекс почти-дубликатов общий для всех источников
+    dedup = DuplicateIndex() if DEDUP_ENABLED else None
+    running: Dict[str, Tuple[asyncio.Task, asyncio.Event]] = {}
+    logger.info(
+        f"Обработчик {worker_id} ({owner}) запущен: источников в настройках {len(sources)}, "
+        f"не больше {max_sources} на процесс"
+    )
+
+    while not stop.is_set():
+        # Продлеваем аренду своих источников; завершившиеся и потерянные освобождаем
+        lost = []
+        for name, (task, source_stop) in list(running.items()):
+            if task.done():
+                if not task.cancelled() and task.exception():
+                    logger.error(f"[{name}] Обработка источника прервана: {task.exception()}")
+                running.pop(name)
+                leases.release(name, owner)
+            elif not leases.renew(name, owner, LEASE_TTL):
+                logger.warning(f"[{name}] Аренда источника потеряна, обработка остановлена")
+                task.cancel()
+                lost.append(task)
+                running.pop(name)
+        # Прерванный цикл еще может писать в хранилища источника:
+        # ждем его завершения, прежде чем источник можно будет взять снова
+        await asyncio.gather(*lost, return_exceptions=True)
+
+        # Берем свободные источники; порядок случайный, чтобы процессы не спорили за одни и те же
+        candidates = [source for source in sources if source.name not in running]
+        random.shuffle(candidates)
+        for source in candidates:
+            if len(running) >= max_sources:
+                break
+            if leases.acquire(source.name, owner, LEASE_TTL):
+                logger.info(f"[{source.name}] Источник взят в работу обработчиком {worker_id}")
+                source_stop = asyncio.Event()
+                task = asyncio.create_task(run_source_forever(source, source_stop, dedup))
+                running[source.name] = (task, source_stop)
+
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=LEASE_RENEW_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+    logger.info("Получен сигнал остановки, завершаем текущие циклы")
+
+    # Даем текущим циклам завершиться, затем прерываем оставшиеся
+    for _, source_stop in running.values():
+        source_stop.set()
+    tasks = [task for task, _ in running.values()]
+    if tasks:
+        done, pending = await asyncio.wait(tasks, timeout=DAEMON_SHUTDOWN_TIMEOUT)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    for name in running:
+        leases.release(name, owner)
+    leases.close()
+    await close_ingestion()
+    close_parse_pool()
+    if dedup is not None:
+        logger.info(f"Дубликаты: {dedup.summary()}")
+        dedup.close()
+    if metrics_runner is not None:
+        await metrics_runner.cleanup()
+    logger.info(f"Обработчик {worker_id} остановлен")
+
+
+def run_worker(worker_id: int) -> None:
+    asyncio.run(main(worker_id))
+
+
+def supervise(workers: int) -> None:
+    """
+    Запускает workers процессов-обработчиков и перезапускает упавшие.
+    SIGTERM/SIGINT передается обработчикам, которые завершают текущие циклы.
+    """
+    context = multiprocessing.get_context('spawn')
+    processes: Dict[int, multiprocessing.Process] = {}
+    stopping = False
+
+    def start(worker_id: int) -> multiprocessing.Process:
+        process = context.Process(target=run_worker, args=(worker_id,), name=f"parser-worker-{worker_id}")
+        process.start()
+        return process
+
+    def handle_stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for process in processes.values():
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    for worker_id in range(workers):
+        processes[worker_id] = start(worker_id)
+    logger.info(f"Парсер запущен в фоновом режиме: {workers} процессов-обработчиков")
+
+    while not stopping:
+        for worker_id, process in list(processes.items()):
+            if not process.is_alive() and not stopping:
+                logger.warning(f"Обработчик {worker_id} завершился с кодом {process.exitcode}, перезапуск")
+                processes[worker_id] = start(worker_id)
+        time.sleep(1)
+
+    for process in processes.values():
+        process.join(DAEMON_SHUTDOWN_TIMEOUT + LEASE_RENEW_INTERVAL)
+        if process.is_alive():
+            process.kill()
+    logger.info("Парсер остановлен")
+
+
+if __name__ == "__main__":
+    if DAEMON_WORKERS > 1:
+        supervise(DAEMON_WORKERS)
+    else:
+        asyncio.run(main())
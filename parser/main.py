@@ -3,10 +3,27 @@ import os
 import asyncio
 import json
 import time
+from typing import Any, Dict, Optional
 
 from models.parser_factory import ParserFactory
-from config import BASE_DIR, AMOUNT_PAGES
-from utils.database import send_to_database, save_to_csv
+from config import (
+    BASE_DIR,
+    JSON_DIR,
+    AMOUNT_PAGES,
+    INCREMENTAL_MAX_PAGES,
+    DEDUP_ENABLED,
+    METRICS_JSON_PATH,
+)
+from utils.database import send_to_database, close_ingestion, save_to_csv
+from utils.checkpoint import CrawlCheckpoint
+from utils.dedup import DuplicateIndex
+from utils.ingestion import IngestionQueue
+from utils.link_store import LinkStore
+from utils.metrics import METRICS, CYCLE_SECONDS, stage_summary, timed_sender, track
+from utils.outbox import Outbox
+from utils.parse_pool import close_parse_pool
+from utils.snapshot import SnapshotWriter
+from utils.sources import load_sources
 
 # Настройка логгера
 logging.basicConfig(
@@ -26,30 +43,6 @@ logging.getLogger('mistralai').setLevel(logging.ERROR)
 
 logger = logging.getLogger(__name__)
 
-# В начале файла добавим константу для пути к JSON файлам
-JSON_DIR = os.path.join(BASE_DIR, 'json_objects')
-
-def load_processed_links(source: str) -> set:
-    """Загружает множество обработанных ссылок"""
-    try:
-        filepath = os.path.join(JSON_DIR, f"processed_links_{source}.json")
-        if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return set(json.load(f))
-    except Exception as e:
-        logger.error(f"Ошибка при загрузке обработанных ссылок: {e}")
-    return set()
-
-def save_processed_links(links: set, source: str) -> None:
-    """Сохраняет множество обработанных ссылок"""
-    try:
-        os.makedirs(JSON_DIR, exist_ok=True)  # Создаем директорию, если её нет
-        filepath = os.path.join(JSON_DIR, f"processed_links_{source}.json")
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(list(links), f, ensure_ascii=False)
-    except Exception as e:
-        logger.error(f"Ошибка при сохранении обработанных ссылок: {e}")
-
 def load_parser_state(source: str) -> bool:
     """Загружает состояние парсера"""
     try:
@@ -71,124 +64,149 @@ def save_parser_state(state: bool, source: str) -> None:
     except Exception as e:
         logger.error(f"Ошибка при сохранении состояния парсера: {e}")
 
-def save_json(items: list, filename: str) -> None:
-    """Сохраняет новости в JSON файл"""
-    try:
-        os.makedirs(JSON_DIR, exist_ok=True)
-        filepath = os.path.join(JSON_DIR, filename)
-        
-        # Убедимся, что все новости имеют правильные поля
-        for item in items:
-            if 'content' in item:
-                item['description'] = item.pop('content')
-            if 'source' in item:
-                item['author'] = item.pop('source')
+async def run_cycle(
+    source: str,
+    parser,
+    processed_links: LinkStore,
+    outbox: Outbox,
+    snapshot: SnapshotWriter
+) -> None:
+    """Выполняет один цикл обработки источника открытым парсером"""
+    # Метки метрик - название источника, как в логах парсера
+    label = parser.source_name
+    send = timed_sender(label, send_to_database)
+    with track(label, 'state'):
+        initial_load_completed = load_parser_state(source)
+    
+    # Сначала досылаем пакеты, которые бэкенд не принял в прошлых циклах
+    await outbox.replay(send)
+    
+    # Первичная загрузка сохраняет контрольную точку: после перезапуска она
+    # продолжается с незавершенных страниц, не отправляя новости повторно
+    checkpoint = None if initial_load_completed else CrawlCheckpoint(source, processed_links)
+    
+    # Новости уходят в бэкенд по мере готовности через общую очередь отправки;
+    # каждый пакет записывается в журнал до отправки и удаляется после 201,
+    # а выход из блока дожидается отправки последнего, неполного пакета
+    async with IngestionQueue(outbox.sender(send, on_stored=checkpoint and checkpoint.mark_sent)) as sink:
+        # Готовые новости также дописываются в NDJSON-снимок для проверки
+        parser.set_sinks(sink, snapshot)
+        try:
+            if not initial_load_completed:
+                if checkpoint.resumed_pages:
+                    logger.info(f"[{source}] Продолжение первичной загрузки: {checkpoint.resumed_pages} страниц уже обработано")
+                else:
+                    logger.info(f"[{source}] Первичная загрузка данных")
+                current_news = await parser.get_news(initial_load=True, pages=AMOUNT_PAGES, checkpoint=checkpoint)
+            else:
+                # Обычный режим - загружаем только новые новости: известные ссылки
+                # отсекаются до загрузки деталей, страницы листаются до первой
+                # серии уже обработанных новостей
+                logger.info(f"[{source}] Проверка новых новостей")
+                current_news = await parser.get_news(
+                    initial_load=False,
+                    pages=INCREMENTAL_MAX_PAGES,
+                    is_known=processed_links.__contains__
+                )
+        finally:
+            parser.set_sinks()
+            snapshot.flush()
+            if checkpoint is not None:
+                checkpoint.flush()
+    # Очередь закрыта: все отправленные новости уже отмечены в контрольной точке
+    if checkpoint is not None:
+        with track(label, 'state'):
+            checkpoint.flush()
+    if parser.duplicate_links:
+        # Дубликаты запоминаем как обработанные: следующие циклы отсекут их как известные
+        with track(label, 'state'):
+            processed_links.add_many(parser.duplicate_links)
+    
+    if not initial_load_completed:
+        if not parser.crawl_complete:
+            # Контрольная точка остается: незавершенные и не полученные страницы
+            # будут обработаны в следующем цикле
+            reason = "обход прерван предохранителем" if parser.crawl_interrupted else "обход неполный"
+            logger.warning(
+                f"[{source}] Первичная загрузка не завершена ({reason}): страниц с ошибкой "
+                f"{len(parser.failed_pages)} {parser.failed_pages[:10]}, новостей с ошибкой {parser.failed_items}. "
+                f"Продолжится в следующем цикле"
+            )
+        elif current_news or checkpoint.resumed_pages:
+            with track(label, 'state'):
+                # Сохраняем все ссылки
+                processed_links.add_many(news['link'] for news in current_news)
+                
+                # Сохраняем состояние
+                save_parser_state(True, source)
+                checkpoint.clear()
+            logger.info(f"[{source}] Первичная загрузка завершена. Обработано {len(current_news)} новостей")
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(items, f, ensure_ascii=False, indent=2)
-        logger.info(f"Сохранено {len(items)} новостей в {filepath}")
-    except Exception as e:
-        logger.error(f"Ошибка при сохранении JSON: {e}")
-
-class NewsBatcher:
-    def __init__(self, batch_size: int = 10):
-        self.batch_size = batch_size
-        self.news_buffer = []
-        self.logger = logging.getLogger(__name__)
-
-    async def add_news(self, news_items: list) -> None:
-        """Добавляет новости в буфер и отправляет, если достигнут размер пакета"""
-        self.news_buffer.extend(news_items)
-        if len(self.news_buffer) >= self.batch_size:
-            await self._send_batch()
-
-    async def _send_batch(self) -> bool:
-        """Отправляет пакет новостей"""
-        if not self.news_buffer:
-            return True
-
-        batch = self.news_buffer[:self.batch_size]
-        success = await send_to_database(batch)
+    elif current_news:
+        # Фильтруем только новые новости
+        with track(label, 'state'):
+            new_news = [
+                news for news in current_news 
+                if news['link'] not in processed_links
+            ]
         
-        if success:
-            self.news_buffer = self.news_buffer[self.batch_size:]
-            return True
-        return False
-
-    async def flush(self) -> bool:
-        """Отправляет все оставшиеся новости"""
-        while self.news_buffer:
-            if not await self._send_batch():
-                return False
-        return True
-
-async def process_news_source(source: str):
+        if new_news:
+            # Обновляем список обработанных ссылок
+            with track(label, 'state'):
+                processed_links.add_many(news['link'] for news in new_news)
+            
+            logger.info(f"[{source}] Найдено {len(new_news)} новых новостей")
+        else:
+            logger.info(f"[{source}] Новых новостей нет")
+
+async def process_news_source(
+    source: str,
+    dedup: Optional[DuplicateIndex] = None,
+    options: Optional[Dict[str, Any]] = None
+):
     """Асинхронно обрабатывает новости из указанного источника"""
+    processed_links = None
+    outbox = None
+    snapshot = None
     try:
-        parser = ParserFactory.get_parser(source)
+        parser = ParserFactory.get_parser(source, **(options or {}))
+        parser.dedup = dedup  # Общий индекс: дубликаты новостей других источников пропускаются
         logger.info(f"[{source}] Начало обработки")
         
-        # Загружаем обработанные ссылки и состояние
-        processed_links = load_processed_links(source)
-        initial_load_completed = load_parser_state(source)
+        # Открываем хранилище обработанных ссылок и журнал отправки
+        processed_links = LinkStore(source)
+        outbox = Outbox(source)
+        snapshot = SnapshotWriter(source)
         
-        async with parser as p:
-            if not initial_load_completed:
-                # Первичная загрузка - используем пакетную обработку
-                logger.info(f"[{source}] Первичная загрузка данных")
-                parser.set_send_callback(send_to_database)  # Включаем пакетную отправку
-                
-                current_news = await p.get_news(initial_load=True, pages=AMOUNT_PAGES)
-                
-                if current_news:
-                    # Сохраняем все ссылки
-                    processed_links.update(news['link'] for news in current_news)
-                    save_processed_links(processed_links, source)
-                    
-                    # Сохраняем состояние
-                    save_parser_state(True, source)
-                    logger.info(f"[{source}] Первичная загрузка завершена. Обработано {len(current_news)} новостей")
-                
-            else:
-                # Обычный режим - проверяем только новые новости
-                logger.info(f"[{source}] Проверка новых новостей")
-                parser.set_send_callback(None)  # Отключаем пакетную отправку
-                current_news = await p.get_news(initial_load=False, pages=1)
-                
-                if current_news:
-                    # Фильтруем только новые новости
-                    new_news = [
-                        news for news in current_news 
-                        if news['link'] not in processed_links
-                    ]
-                    
-                    if new_news:
-                        # Отправляем новые новости одним запросом
-                        await send_to_database(new_news)
-                        
-                        # Обновляем список обработанных ссылок
-                        processed_links.update(news['link'] for news in new_news)
-                        save_processed_links(processed_links, source)
-                        
-                        logger.info(f"[{source}] Найдено {len(new_news)} новых новостей")
-                    else:
-                        logger.info(f"[{source}] Новых новостей нет")
-                
-            # Сохраняем текущие новости в JSON для проверки
-            if current_news:
-                save_json(
-                    current_news,
-                    f"news_{source}.json"
-                )
+        async with parser:
+            started = time.monotonic()
+            await run_cycle(source, parser, processed_links, outbox, snapshot)
+            CYCLE_SECONDS.observe(time.monotonic() - started, parser.source_name)
+            logger.info(f"[{source}] Время по этапам: {stage_summary(parser.source_name)}")
                 
     except Exception as e:
         logger.error(f"[{source}] Ошибка: {str(e)}")
+    finally:
+        if processed_links is not None:
+            processed_links.close()
+        if outbox is not None:
+            outbox.close()
+        if snapshot is not None:
+            snapshot.close()
 
 async def main():
     """Основная функция для запуска парсеров"""
-    sources = ['rscf', 'nauka_rf']
-    tasks = [process_news_source(source) for source in sources]
-    await asyncio.gather(*tasks)
+    # Индекс почти-дубликатов общий для всех источников
+    dedup = DuplicateIndex() if DEDUP_ENABLED else None
+    tasks = [process_news_source(source.name, dedup, source.options) for source in load_sources()]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        await close_ingestion()
+        close_parse_pool()
+        if dedup is not None:
+            logger.info(f"Дубликаты: {dedup.summary()}")
+            dedup.close()
 
 def run_parser():
     """Функция для запуска парсера"""
@@ -205,6 +223,8 @@ def run_parser():
         end_time = time.time()
         duration = round(end_time - start_time, 2)
         print(f"Время выполнения парсинга: {duration} сек.")
+        # Разовый запуск: метрики этапов сохраняются в файл вместо /metrics
+        METRICS.dump_json(METRICS_JSON_PATH)
 
 
 if __name__ == "__main__":
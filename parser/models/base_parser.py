@@ -1,27 +1,278 @@
+import asyncio
+import logging
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Callable
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Tuple
+
+import aiohttp
+
+from config import (
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_TIMEOUT,
+    HTTP_CACHE_ENABLED,
+    EXTRACTION_BACKEND,
+    HTTP_REPLAY_URL,
+    HTTP_RETRIES,
+    HTTP_BACKOFF_BASE,
+    HTTP_BACKOFF_MAX,
+    PARSE_WORKERS,
+    HTTP_RATE_LIMIT,
+    CRAWL_DETAIL_WORKERS,
+)
+from utils.http import ConnectionStats, create_session, replay_url
+from utils.http_cache import HttpCache
+from utils.http_policy import RETRY_STATUSES, backoff_delay, parse_retry_after
+from utils.metrics import CACHE_LOOKUPS, HTTP_RESPONSES, HTTP_RETRIES_TOTAL, ITEMS, track
+from utils.parse_pool import get_parse_pool, parse_detail, reset_parse_pool
+from .crawler import HostLimiterPool
+from .extraction import get_backend
+
+logger = logging.getLogger(__name__)
 
 
 class BaseParser(ABC):
     """Абстрактный базовый класс для всех парсеров новостей"""
-    
+
+    def __init__(
+        self,
+        pool_limit: int = HTTP_POOL_LIMIT,
+        pool_limit_per_host: int = HTTP_POOL_LIMIT_PER_HOST,
+        dns_cache_ttl: int = HTTP_DNS_CACHE_TTL,
+        keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+        timeout: float = HTTP_TIMEOUT,
+        use_http_cache: bool = HTTP_CACHE_ENABLED,
+        extraction_backend: str = EXTRACTION_BACKEND,
+        replay_base_url: Optional[str] = HTTP_REPLAY_URL,
+        retries: int = HTTP_RETRIES,
+        backoff_base: float = HTTP_BACKOFF_BASE,
+        backoff_max: float = HTTP_BACKOFF_MAX,
+        parse_workers: int = PARSE_WORKERS,
+        rate_limit: Optional[float] = HTTP_RATE_LIMIT,
+        detail_workers: int = CRAWL_DETAIL_WORKERS,
+    ):
+        self.headers: Dict[str, str] = {}
+        self.session = None  # Общая сессия парсера, создается в __aenter__
+        self.http_stats = ConnectionStats()
+        self.host_limits = HostLimiterPool(maximum=pool_limit_per_host, rate=rate_limit)
+        self.detail_workers = detail_workers  # Размер пула загрузки детальных страниц
+        self.retries = retries  # Повторы GET-запросов страниц
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.use_http_cache = use_http_cache
+        self.http_cache: Optional[HttpCache] = None
+        # Валидаторы страниц списка текущего обхода: сохраняются, только если обход полный
+        self._listing_validators: Dict[str, Tuple[bytes, Optional[str], Optional[str]]] = {}
+        self.revalidate = False  # Отправлять условные запросы и пропускать неизмененные страницы списка
+        self.extractor = get_backend(extraction_backend)  # Бэкенд разбора HTML
+        self.parse_workers = parse_workers  # Процессов разбора детальных страниц; 0 - в цикле событий
+        self.replay_base_url = replay_base_url  # Сервер воспроизведения записанных ответов
+        self.recorder = None  # recorder(url, status, content_type, body) для записи фикстур
+        self.sinks = ()  # Получатели готовых новостей: очередь отправки, журнал снимков
+        self.dedup = None  # Общий для всех источников индекс почти-дубликатов (DuplicateIndex)
+        # Итог последнего get_news: обход дошел до конца без потерянных страниц и новостей
+        self.crawl_complete = True
+        self.crawl_interrupted = False  # Хост выключен предохранителем, обход прерван
+        self.failed_pages: List[int] = []  # Страницы списка, которые не удалось получить
+        self.failed_items = 0  # Новостей, не обработанных из-за временной ошибки
+        self.duplicate_links: List[str] = []  # Ссылки новостей, пропущенных как дубликаты
+        self._pool_options = {
+            'limit': pool_limit,
+            'limit_per_host': pool_limit_per_host,
+            'dns_cache_ttl': dns_cache_ttl,
+            'keepalive_timeout': keepalive_timeout,
+            'timeout': timeout,
+        }
+
+    async def __aenter__(self):
+        """Открывает одну HTTP-сессию с пулом соединений на весь запуск парсера"""
+        self.session = create_session(
+            headers=self.headers,
+            stats=self.http_stats,
+            **self._pool_options
+        )
+        if self.use_http_cache:
+            self.http_cache = HttpCache()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Закрывает сессию и выводит статистику переиспользования соединений"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+        logger.info(f"[{self.source_name}] HTTP-пул: {self.http_stats.summary()}")
+        logger.info(f"[{self.source_name}] Параллельность по хостам: {self.host_limits.summary()}")
+        if self.http_cache:
+            logger.info(f"[{self.source_name}] HTTP-кэш: {self.http_cache.summary()}")
+            self.http_cache.close()
+            self.http_cache = None
+
+    @asynccontextmanager
+    async def _request(self, method: str, url: str, **kwargs):
+        """
+        Выполняет запрос через общую сессию в пределах адаптивного лимита хоста,
+        его частоты и предохранителя (CircuitOpenError, если хост приостановлен).
+        Тело ответа нужно прочитать внутри блока, а разбирать - уже после него,
+        чтобы время разбора не считалось задержкой хоста.
+        """
+        limiter = self.host_limits.for_url(url)
+        if self.replay_base_url:
+            url = replay_url(self.replay_base_url, url)
+
+        probe = await limiter.acquire()
+        started = time.monotonic()
+        ok = False
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                HTTP_RESPONSES.inc(self.source_name, str(response.status))
+                ok = response.status < 500 and response.status != 429
+                if response.status in (429, 503):
+                    # Сервер просит подождать: приостанавливаем все запросы к хосту
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if retry_after:
+                        limiter.pause(min(retry_after, self.backoff_max))
+                yield response
+        finally:
+            await limiter.release(time.monotonic() - started, ok, probe)
+
+    async def _get_cached(self, url: str, stage: str = 'detail') -> Tuple[int, Optional[str]]:
+        """
+        Загружает страницу через HTTP-кэш. Возвращает (статус, текст).
+        При self.revalidate страница списка (stage 'listing') запрашивается условно,
+        и для неизмененной страницы (ответ 304 или тот же хэш тела) возвращается
+        (304, None). Новые валидаторы страниц списка сохраняет _record_crawl,
+        когда все новости обхода обработаны. Детальные страницы загружаются всегда: новость с неизмененной
+        страницей могла быть не доставлена в прошлый раз.
+        Время загрузки учитывается в метриках как этап stage ('listing' или 'detail').
+        Ошибки соединения, таймауты, 429 и 5xx повторяются до self.retries раз
+        с экспоненциальной задержкой (не меньше Retry-After).
+        """
+        cached = self.http_cache is not None and stage == 'listing'
+        revalidate = cached and self.revalidate
+        headers = {}
+        if revalidate:
+            headers = self.http_cache.conditional_headers(url)
+
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                with self._track(stage):
+                    async with self._request('GET', url, headers=headers) as response:
+                        if response.status == 304:
+                            self.http_cache.hits += 1
+                            CACHE_LOOKUPS.inc(self.source_name, 'http', 'hit')
+                            return 304, None
+                        if response.status == 200:
+                            body = await response.read()
+                            text = await response.text()
+                            etag = response.headers.get('ETag')
+                            last_modified = response.headers.get('Last-Modified')
+                            break
+                        if response.status not in RETRY_STATUSES or attempt == self.retries:
+                            return response.status, None
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+
+            HTTP_RETRIES_TOTAL.inc(self.source_name)
+            await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after))
+
+        if self.recorder:
+            self.recorder(url, response.status, response.content_type, body)
+
+        if cached:
+            unchanged = self.http_cache.is_unchanged(url, body)
+            if not unchanged:
+                self._listing_validators[url] = (body, etag, last_modified)
+            if unchanged and revalidate:
+                self.http_cache.hits += 1
+                CACHE_LOOKUPS.inc(self.source_name, 'http', 'hit')
+                return 304, None
+            self.http_cache.misses += 1
+            CACHE_LOOKUPS.inc(self.source_name, 'http', 'miss')
+        return 200, text
+
+    async def _parse_detail(self, html: str) -> Optional[Dict[str, Any]]:
+        """
+        Разбирает детальную страницу вне цикла событий - в общем пуле процессов,
+        чтобы разбор одной страницы не задерживал остальные загрузки.
+        """
+        with self._track('parse'):
+            pool = get_parse_pool(self.parse_workers)
+            if pool is None:
+                return self.parse_news_detail(html)
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(pool, parse_detail, type(self), self.extractor.name, html)
+            except BrokenProcessPool:
+                logger.error(f"[{self.source_name}] Процесс пула разбора упал, пул будет создан заново")
+                reset_parse_pool()
+                return self.parse_news_detail(html)
+
     @abstractmethod
     def get_news(self, **kwargs) -> List[Dict[str, str]]:
         """Получает список новостей"""
         pass
-    
+
     @abstractmethod
     def get_news_detail(self, url: str) -> Dict[str, Any]:
         """Получает детальную информацию о новости"""
         pass
-    
+
     @property
     @abstractmethod
     def source_name(self) -> str:
         """Возвращает название источника новостей"""
         pass
 
-    @abstractmethod
-    def set_send_callback(self, callback: Callable):
-        """Устанавливает функцию для отправки данных"""
-        pass 
\ No newline at end of file
+    def _track(self, stage: str):
+        """Контекстный менеджер, замеряющий время этапа источника для метрик"""
+        return track(self.source_name, stage)
+
+    def _record_crawl(self, scheduler) -> None:
+        """
+        Запоминает итог обхода (полный ли он, потерянные страницы и новости),
+        сохраняет валидаторы страниц списка полного обхода и учитывает
+        в метриках новости, отброшенные как уже обработанные
+        """
+        self.crawl_complete = scheduler.complete
+        self.crawl_interrupted = scheduler.interrupted
+        self.failed_pages = list(scheduler.failed_pages)
+        self.failed_items = scheduler.items_failed
+        self.duplicate_links = list(scheduler.duplicate_keys)
+        if self.http_cache and scheduler.complete:
+            for url, (body, etag, last_modified) in self._listing_validators.items():
+                self.http_cache.store(url, body, etag, last_modified)
+        # После неполного обхода страницы списка остаются "измененными":
+        # следующий цикл разберет их снова и повторит потерянные новости
+        self._listing_validators.clear()
+        if scheduler.known_skipped:
+            ITEMS.inc(self.source_name, 'known', amount=scheduler.known_skipped)
+
+    def set_sinks(self, *sinks) -> None:
+        """Устанавливает получателей готовых новостей (объекты с async put); без аргументов - никому"""
+        self.sinks = sinks
+
+    def _is_duplicate(self, link: str, title: str) -> bool:
+        """Проверяет заголовок по индексу почти-дубликатов до загрузки деталей и классификации"""
+        if self.dedup is None:
+            return False
+        original = self.dedup.check(self.source_name, link, title)
+        if original:
+            ITEMS.inc(self.source_name, 'duplicate')
+            logger.info(f"[{self.source_name}] Пропущен дубликат {link}: совпадает с {original[0]} {original[1]}")
+            return True
+        return False
+
+    async def _emit(self, news: Dict) -> None:
+        """Передает готовую новость всем получателям и запоминает ее в индексе дубликатов"""
+        ITEMS.inc(self.source_name, 'emitted')
+        for sink in self.sinks:
+            await sink.put(news)
+        if self.dedup is not None:
+            self.dedup.record(self.source_name, news['link'], news['title'])
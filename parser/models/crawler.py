@@ -0,0 +1,380 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import (
+    CRAWL_PAGE_WINDOW,
+    CRAWL_DETAIL_WORKERS,
+    CRAWL_INITIAL_CONCURRENCY,
+    CRAWL_MIN_CONCURRENCY,
+    CRAWL_TARGET_LATENCY,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_RATE_LIMIT,
+    HTTP_RATE_BURST,
+    HTTP_HOST_RATE_LIMITS,
+    HTTP_BREAKER_THRESHOLD,
+    HTTP_BREAKER_COOLDOWN,
+    HTTP_BREAKER_MAX_COOLDOWN,
+    INCREMENTAL_KNOWN_RUN,
+)
+from utils.http_policy import CircuitBreaker, CircuitOpenError, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class HostLimiter:
+    """
+    Адаптивный лимит параллельных запросов к одному хосту.
+    Лимит плавно растет, пока ответы быстрые, медленно снижается при росте
+    задержки и уменьшается вдвое при ошибках (AIMD).
+    Кроме того, частота запросов ограничена токенами (rate в секунду),
+    а предохранитель приостанавливает хост после серии ошибок подряд.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        initial: int = CRAWL_INITIAL_CONCURRENCY,
+        minimum: int = CRAWL_MIN_CONCURRENCY,
+        maximum: int = HTTP_POOL_LIMIT_PER_HOST,
+        target_latency: float = CRAWL_TARGET_LATENCY,
+        rate: Optional[float] = HTTP_RATE_LIMIT,
+        burst: int = HTTP_RATE_BURST,
+        breaker_threshold: int = HTTP_BREAKER_THRESHOLD,
+        breaker_cooldown: float = HTTP_BREAKER_COOLDOWN,
+        breaker_max_cooldown: float = HTTP_BREAKER_MAX_COOLDOWN,
+    ):
+        self.host = host
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.target_latency = target_latency
+        self.latency = None  # Экспоненциальное среднее задержки ответа
+        self.requests = 0
+        self.errors = 0
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(host, breaker_threshold, breaker_cooldown, breaker_max_cooldown)
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> bool:
+        """
+        Ждет свободного слота и токена частоты. Выбрасывает CircuitOpenError,
+        если хост приостановлен. Возвращает True для пробного запроса предохранителя.
+        """
+        probe = self.breaker.before_request()
+        try:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+                self._in_flight += 1
+            try:
+                await self.bucket.acquire()
+            except BaseException:
+                async with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+                raise
+        except BaseException:
+            if probe:
+                self.breaker.cancel_probe()
+            raise
+        return probe
+
+    def pause(self, seconds: float) -> None:
+        """Приостанавливает выдачу токенов хоста (по Retry-After)"""
+        self.bucket.pause(seconds)
+
+    async def release(self, latency: float, ok: bool, probe: bool = False) -> None:
+        """Освобождает слот и подстраивает лимит по задержке и результату запроса"""
+        self.breaker.record(ok, probe)
+        async with self._condition:
+            self._in_flight -= 1
+            self.requests += 1
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+
+            if not ok:
+                self.errors += 1
+                self.limit = max(self.minimum, self.limit / 2)
+            elif self.latency > self.target_latency:
+                self.limit = max(self.minimum, self.limit - 1 / self.limit)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+            self._condition.notify_all()
+
+    def summary(self) -> str:
+        latency = f"{self.latency:.2f} сек." if self.latency is not None else "—"
+        return (
+            f"{self.host}: лимит {int(self.limit)}, запросов {self.requests}, "
+            f"ошибок {self.errors}, задержка {latency}, "
+            f"ожидание токенов {self.bucket.waited:.1f} сек., "
+            f"приостановок {self.breaker.trips}, отклонено {self.breaker.rejected}"
+        )
+
+
+class HostLimiterPool:
+    """Набор адаптивных лимитов, по одному на каждый хост"""
+
+    def __init__(self, host_rates: Optional[Dict[str, float]] = None, **limiter_options):
+        self._limiter_options = limiter_options
+        # Частота запросов к отдельным хостам, например {'rscf.ru': 5}
+        self._host_rates = HTTP_HOST_RATE_LIMITS if host_rates is None else host_rates
+        self._limiters: Dict[str, HostLimiter] = {}
+
+    def for_url(self, url: str) -> HostLimiter:
+        host = urlsplit(url).hostname or ''
+        if host not in self._limiters:
+            options = dict(self._limiter_options)
+            if host in self._host_rates:
+                options['rate'] = self._host_rates[host]
+            self._limiters[host] = HostLimiter(host, **options)
+        return self._limiters[host]
+
+    def summary(self) -> str:
+        return '; '.join(limiter.summary() for limiter in self._limiters.values())
+
+
+class CrawlScheduler:
+    """
+    Планировщик обхода: загружает страницы списка наперед в ограниченном окне
+    и передает найденные новости в общий пул загрузки деталей.
+
+    fetch_listing(page) возвращает список заготовок новостей, [] когда страницы
+    закончились, или None, если страницу не удалось получить.
+    fetch_item(stub) возвращает готовую новость или None.
+    При ordered=True on_item вызывается строго в порядке источника,
+    даже если детали загружаются в другом порядке.
+
+    Инкрементальный режим (задан is_known): уже обработанные новости
+    отбрасываются до загрузки деталей, страницы запрашиваются по одной,
+    и обход останавливается, как только подряд встретилось known_run
+    известных новостей.
+
+    is_duplicate(stub) отбрасывает почти-дубликаты новостей других
+    источников до загрузки деталей. В серии известных новостей дубликат
+    считается известным, а его ключ (item_key) попадает в duplicate_keys,
+    чтобы вызывающий код запомнил его как обработанный.
+
+    checkpoint (CrawlCheckpoint) и item_key(stub) - ссылка новости - включают
+    возобновление первичной загрузки: завершенные страницы не запрашиваются,
+    уже отправленные новости пропускаются, а отброшенные новости отмечаются
+    в контрольной точке, чтобы страница могла считаться завершенной.
+    Отброшенной считается только новость, для которой fetch_item вернул None
+    (нет содержимого, страница не изменилась). Если fetch_item выбросил
+    исключение (таймаут, 5xx после повторов, хост выключен предохранителем),
+    ошибка временная: новость не отмечается, и ее страница будет обработана
+    снова при возобновлении.
+
+    complete - обход дошел до конца: run завершился, страница списка
+    не потерялась (failed_pages), ни одна новость не завершилась ошибкой
+    (items_failed) и обход не прерван предохранителем.
+
+    on_page(stubs) вызывается с новостями страницы, оставшимися после
+    фильтров, до постановки их в очередь - например, чтобы одним запросом
+    классифицировать заголовки всей страницы.
+    """
+
+    def __init__(
+        self,
+        fetch_listing: Callable[[int], Awaitable[Optional[List[Dict]]]],
+        fetch_item: Callable[[Dict], Awaitable[Optional[Dict]]],
+        on_item: Optional[Callable[[Dict], Awaitable[Any]]] = None,
+        page_window: int = CRAWL_PAGE_WINDOW,
+        workers: int = CRAWL_DETAIL_WORKERS,
+        ordered: bool = False,
+        is_known: Optional[Callable[[Dict], bool]] = None,
+        known_run: int = INCREMENTAL_KNOWN_RUN,
+        is_duplicate: Optional[Callable[[Dict], bool]] = None,
+        checkpoint=None,
+        item_key: Optional[Callable[[Dict], str]] = None,
+        on_page: Optional[Callable[[List[Dict]], Any]] = None,
+    ):
+        self._fetch_listing = fetch_listing
+        self._fetch_item = fetch_item
+        self._on_item = on_item
+        self._is_known = is_known
+        self._is_duplicate = is_duplicate
+        self._checkpoint = checkpoint if item_key else None
+        self._item_key = item_key
+        self._on_page = on_page
+        # В инкрементальном режиме каждая следующая страница может оказаться лишней
+        self.page_window = 1 if is_known else max(1, page_window)
+        self.workers = max(1, workers)
+        self.ordered = ordered
+        self.known_run = max(1, known_run)
+        self.pages_fetched = 0
+        self.known_skipped = 0
+        self.duplicates_skipped = 0
+        self.duplicate_keys: List[str] = []  # Ключи пропущенных дубликатов
+        self.interrupted = False  # Хост приостановлен предохранителем, обход прерван
+        self.pages_resumed = 0  # Страниц, пропущенных как завершенные по контрольной точке
+        self.sent_skipped = 0  # Новостей, уже отправленных до перезапуска
+        self.failed_pages: List[int] = []  # Страницы списка, которые не удалось получить
+        self.items_failed = 0  # Новостей, не обработанных из-за временной ошибки
+        self.finished = False  # run дошел до конца без исключения
+
+        # Состояние упорядоченной выдачи: размеры страниц, завершенные
+        # новости и позиция следующей новости для on_item
+        self._page_sizes: Dict[int, int] = {}
+        self._completed: Dict[Tuple[int, int], Optional[Dict]] = {}
+        self._cursor = (1, 0)
+        self._emit_lock = asyncio.Lock()
+
+    async def run(self, pages: int) -> List[Dict]:
+        """Обходит страницы 1..pages и возвращает новости в порядке источника"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        results: Dict[Tuple[int, int], Dict] = {}
+
+        workers = [
+            asyncio.create_task(self._worker(queue, results))
+            for _ in range(self.workers)
+        ]
+        try:
+            await self._produce(queue, pages)
+            await queue.join()
+            self.finished = True
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return [results[key] for key in sorted(results)]
+
+    @property
+    def complete(self) -> bool:
+        return self.finished and not self.interrupted and not self.failed_pages and not self.items_failed
+
+    async def _produce(self, queue: asyncio.Queue, pages: int) -> None:
+        """Загружает страницы списка наперед и ставит их новости в очередь"""
+        pending = deque()
+        next_page = 1
+        exhausted = False
+        known_in_row = 0
+
+        try:
+            while pending or (next_page <= pages and not exhausted):
+                while not exhausted and next_page <= pages and len(pending) < self.page_window:
+                    if self._checkpoint and self._checkpoint.is_page_done(next_page):
+                        # Страница полностью обработана до перезапуска
+                        self._page_sizes[next_page] = 0
+                        self.pages_resumed += 1
+                        next_page += 1
+                        continue
+                    pending.append((next_page, asyncio.create_task(self._safe_listing(next_page))))
+                    next_page += 1
+                if not pending:
+                    continue
+
+                page, task = pending.popleft()
+                stubs = await task
+                if self.interrupted:
+                    # Следующие страницы тоже будут отклонены - не запрашиваем их
+                    exhausted = True
+                if not stubs:
+                    self._page_sizes[page] = 0
+                    if stubs is None:
+                        # Страница не получена: обход неполный, при возобновлении она запрашивается снова
+                        self.failed_pages.append(page)
+                    else:
+                        # Страницы закончились: новые не запрашиваем, уже начатые дожидаемся
+                        exhausted = True
+                    continue
+
+                self.pages_fetched += 1
+                if self._is_known or self._is_duplicate:
+                    new_stubs = []
+                    for stub in stubs:
+                        known = self._is_known is not None and self._is_known(stub)
+                        if known:
+                            self.known_skipped += 1
+                        elif self._is_duplicate and self._is_duplicate(stub):
+                            # Для длины серии дубликат не отличается от известной новости
+                            self.duplicates_skipped += 1
+                            if self._item_key:
+                                self.duplicate_keys.append(self._item_key(stub))
+                            known = True
+                        if not known:
+                            known_in_row = 0
+                            new_stubs.append(stub)
+                            continue
+                        known_in_row += 1
+                        if self._is_known and known_in_row >= self.known_run:
+                            # Дальше идут уже обработанные новости
+                            exhausted = True
+                            break
+                    stubs = new_stubs
+
+                if self._checkpoint:
+                    unsent_stubs = [stub for stub in stubs if not self._checkpoint.is_sent(self._item_key(stub))]
+                    self.sent_skipped += len(stubs) - len(unsent_stubs)
+                    stubs = unsent_stubs
+
+                self._page_sizes[page] = len(stubs)
+                if self._checkpoint:
+                    self._checkpoint.start_page(page, [self._item_key(stub) for stub in stubs])
+                if self._on_page and stubs:
+                    self._on_page(stubs)
+                for index, stub in enumerate(stubs):
+                    await queue.put((page, index, stub))  # Ждет, если пул деталей перегружен
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def _safe_listing(self, page: int) -> Optional[List[Dict]]:
+        try:
+            return await self._fetch_listing(page)
+        except CircuitOpenError as e:
+            if not self.interrupted:
+                logger.warning(f"Обход прерван на странице {page}: {e}")
+            self.interrupted = True
+            return None
+        except Exception as e:
+            logger.error(f"Ошибка при получении страницы {page}: {str(e)}")
+            return None
+
+    async def _worker(self, queue: asyncio.Queue, results: Dict[Tuple[int, int], Dict]) -> None:
+        """Загружает детали новостей из общей очереди"""
+        while True:
+            page, index, stub = await queue.get()
+            item = None
+            try:
+                item = await self._fetch_item(stub)
+                if item:
+                    results[(page, index)] = item
+                    if self._on_item and not self.ordered:
+                        await self._on_item(item)
+                elif self._checkpoint:
+                    # Новость отброшена окончательно. После временной ошибки (исключения)
+                    # она не отмечается, и страница остается незавершенной
+                    self._checkpoint.resolve(self._item_key(stub))
+            except Exception as e:
+                self.items_failed += 1
+                logger.error(f"Ошибка при обработке новости со страницы {page}: {str(e)}")
+            finally:
+                if self.ordered:
+                    self._completed[(page, index)] = item
+                    await self._emit_ready()
+                queue.task_done()
+
+    async def _emit_ready(self) -> None:
+        """Передает в on_item все новости, для которых готовы предыдущие по порядку"""
+        async with self._emit_lock:
+            while True:
+                page, index = self._cursor
+                if page not in self._page_sizes:
+                    return
+                if index >= self._page_sizes[page]:
+                    self._cursor = (page + 1, 0)
+                    continue
+                if (page, index) not in self._completed:
+                    return
+
+                item = self._completed.pop((page, index))
+                self._cursor = (page, index + 1)
+                if item and self._on_item:
+                    try:
+                        await self._on_item(item)
+                    except Exception as e:
+                        logger.error(f"Ошибка при передаче новости со страницы {page}: {str(e)}")
@@ -0,0 +1,60 @@
+import logging
+from typing import Dict, Optional, Type
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionBackend:
+    """
+    Бэкенд разбора HTML. Все бэкенды возвращают дерево BeautifulSoup,
+    поэтому код извлечения в парсерах одинаков для любого из них.
+    """
+
+    name = 'html.parser'
+    builder = 'html.parser'
+
+    def parse(self, html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Разбирает HTML; parse_only ограничивает дерево нужными элементами"""
+        return BeautifulSoup(html, self.builder, parse_only=parse_only)
+
+
+class SoupBackend(ExtractionBackend):
+    """Чистый Python-разбор через html.parser: медленно, но без зависимостей"""
+
+    def parse(self, html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        # Полное дерево, как до появления бэкендов: используется как эталон и запасной путь
+        return BeautifulSoup(html, self.builder)
+
+
+class LxmlBackend(ExtractionBackend):
+    """
+    Быстрый путь: дерево строит libxml2 через lxml, и в него попадают только
+    элементы, которые парсер затем ищет (parse_only).
+    """
+
+    name = 'lxml'
+    builder = 'lxml'
+
+
+BACKENDS: Dict[str, Type[ExtractionBackend]] = {
+    SoupBackend.name: SoupBackend,
+    LxmlBackend.name: LxmlBackend,
+}
+
+
+def get_backend(name: str) -> ExtractionBackend:
+    """Возвращает бэкенд по имени, откатываясь на html.parser, если lxml недоступен"""
+    backend_class = BACKENDS.get(name)
+    if not backend_class:
+        raise ValueError(f"Бэкенд разбора HTML '{name}' не найден")
+
+    if backend_class is LxmlBackend:
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            logger.warning("lxml не установлен, используется html.parser")
+            backend_class = SoupBackend
+
+    return backend_class()
@@ -0,0 +1,159 @@
+import re
+from typing import List, Optional, Tuple
+
+from bs4 import NavigableString, Tag
+
+# Виды блоков markdown-документа
+PARAGRAPH = 'paragraph'
+QUOTE = 'quote'
+IMAGE = 'image'
+
+Block = Tuple[str, str]
+
+_NEWLINE_RUN = re.compile(r'\n{3,}')
+
+
+def absolute_url(url: str, base_url: str) -> str:
+    """Дополняет относительную ссылку адресом сайта base_url (без завершающего /)"""
+    if url.startswith('/'):
+        return f"{base_url}{url}"
+    if not url.startswith(('http://', 'https://')):
+        return f"{base_url}/{url}"
+    return url
+
+
+def collapse_newlines(text: str) -> str:
+    """Заменяет три и более переноса строки подряд одной пустой строкой"""
+    if '\n\n\n' not in text:
+        return text
+    return _NEWLINE_RUN.sub('\n\n', text)
+
+
+class MarkdownRenderer:
+    """
+    Однопроходный рендер поддерева DOM в markdown.
+
+    render_blocks обходит поддерево один раз в порядке документа и собирает
+    блоки: абзацы (<p>), цитаты (<blockquote>) и изображения (image_source).
+    Текст блока со ссылками [текст](адрес) пишется в буфер по ходу обхода,
+    без повторного поиска ссылок и замен в готовом тексте. Место блока
+    резервируется при входе в элемент, поэтому изображения внутри абзаца
+    следуют за ним, как в исходном документе.
+
+    join склеивает блоки в строку; разделители между блоками определяет
+    separator, его переопределяют парсеры с другой раскладкой текста.
+    """
+
+    links = True  # <a> выводится ссылкой markdown, иначе только текстом
+    quotes = True  # <blockquote> - отдельный блок, абзацы внутри него - часть цитаты
+    keep_empty = True  # Пустые абзацы остаются пустыми блоками
+    collapse = False  # Три и более переноса строки в тексте блока сжимаются в один пустой
+
+    def __init__(self, base_url: str = ''):
+        self.base_url = base_url
+
+    def image_source(self, element: Tag) -> Optional[str]:
+        """Адрес изображения, если элемент - изображение; иначе None"""
+        if element.name == 'img':
+            return element.get('src') or None
+        return None
+
+    def text(self, text: str) -> str:
+        """Окончательный текст блока"""
+        text = text.strip()
+        return collapse_newlines(text) if self.collapse else text
+
+    def link(self, element: Tag, text: str) -> str:
+        """Ссылка markdown; пробелы по краям текста ссылки остаются снаружи"""
+        stripped = text.strip()
+        if not stripped:
+            return text
+        start = text.index(stripped[0])
+        url = absolute_url(element.get('href', ''), self.base_url)
+        return f"{text[:start]}[{stripped}]({url}){text[start + len(stripped):]}"
+
+    def separator(self, previous: Optional[str], kind: str) -> str:
+        """Разделитель перед блоком kind, если перед ним блок previous (None - первый блок)"""
+        return '' if previous is None else '\n\n'
+
+    def inline(self, element: Tag) -> str:
+        """Текст элемента со ссылками без учета блоков (как .text.strip())"""
+        parts: List[str] = []
+        self._walk(element, None, parts)
+        return self.text(''.join(parts))
+
+    def render_blocks(self, root: Tag, blocks: Optional[List[Block]] = None) -> List[Block]:
+        """Добавляет блоки поддерева root в blocks и возвращает список"""
+        if blocks is None:
+            blocks = []
+        self._walk(root, blocks, None)
+        return blocks
+
+    def join(self, blocks: List[Block]) -> str:
+        buffer: List[str] = []
+        previous = None
+        for kind, text in blocks:
+            if kind == PARAGRAPH and not text and not self.keep_empty:
+                continue
+            buffer.append(self.separator(previous, kind))
+            buffer.append(text)
+            previous = kind
+        return ''.join(buffer)
+
+    def _walk(
+        self,
+        node: Tag,
+        blocks: Optional[List[Block]],
+        parts: Optional[List[str]],
+        quoted: bool = False
+    ) -> None:
+        """
+        blocks - список блоков документа (None - только текст), parts - буфер
+        текста текущего блока (None - вне блоков), quoted - внутри цитаты.
+        """
+        for child in node.children:
+            if not isinstance(child, Tag):
+                # Как и .text, учитываем только обычный текст, без комментариев
+                if parts is not None and type(child) is NavigableString:
+                    parts.append(child)
+                continue
+
+            name = child.name
+            if name == 'a' and self.links and parts is not None:
+                link_parts: List[str] = []
+                self._walk(child, blocks, link_parts, quoted)
+                parts.append(self.link(child, ''.join(link_parts)))
+                continue
+
+            if blocks is not None:
+                src = self.image_source(child)
+                if src:
+                    blocks.append((IMAGE, f"![image]({src})"))
+
+                if name == 'blockquote' and self.quotes:
+                    self._render_block(child, blocks, parts, QUOTE, quoted=True)
+                    continue
+                if name == 'p' and not quoted:
+                    self._render_block(child, blocks, parts, PARAGRAPH, quoted)
+                    continue
+
+            self._walk(child, blocks, parts, quoted)
+
+    def _render_block(
+        self,
+        element: Tag,
+        blocks: List[Block],
+        parts: Optional[List[str]],
+        kind: str,
+        quoted: bool
+    ) -> None:
+        index = len(blocks)
+        blocks.append((kind, ''))  # Место блока: вложенные блоки идут после него
+        block_parts: List[str] = []
+        self._walk(element, blocks, block_parts, quoted)
+        text = ''.join(block_parts)
+        if parts is not None:
+            # Вложенный блок остается и частью текста внешнего
+            parts.append(text)
+        text = self.text(text)
+        blocks[index] = (kind, f"> {text}" if kind == QUOTE else text)
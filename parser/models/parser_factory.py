@@ -1,28 +1,74 @@
-from typing import Dict, Type
+import importlib
+import logging
+from importlib.metadata import entry_points
+from typing import Dict, List, Type, Union
+
 from .base_parser import BaseParser
-from .parsers.rscf_parser import RscfParser
-from .parsers.nauka_rf import NaukaRfParser
+
+logger = logging.getLogger(__name__)
+
+# Группа entry points, через которую сторонние пакеты могут добавлять парсеры:
+#   [project.entry-points."rniirs_parser.parsers"]
+#   other_source = "other_package.parser:OtherSourceParser"
+ENTRY_POINT_GROUP = 'rniirs_parser.parsers'
 
 
 class ParserFactory:
-    """Фабрика для создания парсеров"""
-    
-    _parsers: Dict[str, Type[BaseParser]] = {
-        'rscf': RscfParser,
-        'nauka_rf': NaukaRfParser,
+    """
+    Фабрика для создания парсеров.
+    Парсеры регистрируются путем вида "модуль:Класс" и импортируются только
+    при первом обращении, поэтому запуск одного источника не тянет
+    зависимости остальных.
+    """
+
+    _parsers: Dict[str, Union[str, Type[BaseParser]]] = {
+        'rscf': '.parsers.rscf_parser:RscfParser',
+        'nauka_rf': '.parsers.nauka_rf:NaukaRfParser',
         # Здесь будут добавляться новые парсеры
-        # 'other_source': OtherSourceParser,
+        # 'other_source': '.parsers.other_source:OtherSourceParser',
     }
-    
+    _entry_points_loaded = False
+
+    @classmethod
+    def _load_entry_points(cls) -> None:
+        """Добавляет парсеры из entry points установленных пакетов (без импорта)"""
+        if cls._entry_points_loaded:
+            return
+        cls._entry_points_loaded = True
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            cls._parsers.setdefault(entry_point.name, entry_point.value)
+
     @classmethod
-    def get_parser(cls, source: str) -> BaseParser:
-        """Создает и возвращает парсер для указанного источника"""
+    def get_parser_class(cls, source: str) -> Type[BaseParser]:
+        """Возвращает класс парсера, при необходимости импортируя его модуль"""
+        if source not in cls._parsers:
+            cls._load_entry_points()
+
         parser_class = cls._parsers.get(source)
         if not parser_class:
             raise ValueError(f"Парсер для источника '{source}' не найден")
-        return parser_class()
-    
+
+        if isinstance(parser_class, str):
+            module_path, _, class_name = parser_class.partition(':')
+            module = importlib.import_module(module_path, __package__)
+            parser_class = getattr(module, class_name)
+            cls._parsers[source] = parser_class
+            logger.debug(f"Загружен парсер {source}: {module.__name__}.{class_name}")
+
+        return parser_class
+
+    @classmethod
+    def get_parser(cls, source: str, **options) -> BaseParser:
+        """Создает и возвращает парсер для указанного источника; options передаются конструктору"""
+        return cls.get_parser_class(source)(**options)
+
+    @classmethod
+    def register_parser(cls, source: str, parser_class: Union[str, Type[BaseParser]]) -> None:
+        """Регистрирует новый парсер: класс или путь вида "модуль:Класс" """
+        cls._parsers[source] = parser_class
+
     @classmethod
-    def register_parser(cls, source: str, parser_class: Type[BaseParser]) -> None:
-        """Регистрирует новый парсер"""
-        cls._parsers[source] = parser_class 
\ No newline at end of file
+    def sources(cls) -> List[str]:
+        """Возвращает список зарегистрированных источников"""
+        cls._load_entry_points()
+        return list(cls._parsers)
@@ -1,19 +1,64 @@
 import aiohttp
 import logging
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 import asyncio
-from bs4 import BeautifulSoup
-import re
+from bs4 import SoupStrainer, Tag
 import json
 import os
-from mistralai import Mistral
 from dotenv import load_dotenv
 from ..base_parser import BaseParser
+from ..crawler import CrawlScheduler
+from ..markdown import IMAGE, MarkdownRenderer
+from config import NAUKA_PIPELINE_WIDTH, CATEGORY_CACHE_ENABLED
+from utils.category_cache import CategoryCache
+from utils.http_policy import RETRY_STATUSES, RetryableStatusError
+from utils.metrics import CACHE_LOOKUPS
+
+# Элементы детальной страницы, которые нужны для извлечения новости
+DETAIL_ELEMENTS = SoupStrainer(['h1', 'time', 'div'], class_=[
+    'u-inner-header__title',
+    'u-news-detail__date',
+    'u-news-detail-page__text-content',
+])
+
+# Вводный текст (первый <b> контента), после него всегда пустая строка
+INTRO = 'intro'
+
+
+class NaukaRfMarkdown(MarkdownRenderer):
+    """
+    Markdown детальной страницы наука.рф: ссылки выводятся текстом, пустые
+    абзацы пропускаются, абзацы разделяются переносом строки, а изображения
+    отделяются от текста пустой строкой.
+    """
+
+    links = False
+    quotes = False
+    keep_empty = False
+    collapse = True
+
+    def image_source(self, element: Tag) -> Optional[str]:
+        if element.name == 'img-wyz':
+            return element.get('src') or None
+        return None
+
+    def separator(self, previous: Optional[str], kind: str) -> str:
+        if previous is None:
+            return '\n' if kind == IMAGE else ''
+        if previous != INTRO and (previous == IMAGE) != (kind == IMAGE):
+            return '\n\n'
+        return '\n'
+
 
 class NaukaRfParser(BaseParser):
-    def __init__(self):
-        super().__init__()
+    def __init__(
+        self,
+        pipeline_width: int = NAUKA_PIPELINE_WIDTH,
+        use_category_cache: bool = CATEGORY_CACHE_ENABLED,
+        **pool_options
+    ):
+        super().__init__(**pool_options)
         # Загружаем переменные окружения
         load_dotenv()
         
@@ -24,9 +69,10 @@ class NaukaRfParser(BaseParser):
         }
         
         # Инициализация ML
-        self.ML_API_URL = "http://classifier-api:8001/predict"
-        
-        self.session = None  # Добавляем атрибут для хранения сессии
+        self.ML_BASE_URL = "http://classifier-api:8001"
+        self.ML_API_URL = f"{self.ML_BASE_URL}/predict"
+        self.ML_BATCH_URL = f"{self.ML_API_URL}/batch"
+        self._batch_supported = True  # False, если classifier-api без /predict/batch
         
         self.categories = [
             'Интервью', 'Физика и космос', 'Инженерные науки', 
@@ -40,27 +86,34 @@ class NaukaRfParser(BaseParser):
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.WARNING)  # Показывать только ошибки
 
-        self.news_buffer = []
-        self.batch_size = 10
-        self._send_callback = None  # Добавляем атрибут для колбэка
-        self._category_cache = {}  # Кэш для категорий
-
-    @property
-    def source_name(self) -> str:
-        """Возвращает название источника новостей"""
-        return "наука.рф"
+        self.use_category_cache = use_category_cache
+        self.category_cache: Optional[CategoryCache] = None  # Кэш категорий, открывается на время запуска
+        self._page_categories: Dict[str, asyncio.Task] = {}  # Заголовок -> запрос категорий его страницы
+        self.pipeline_width = pipeline_width  # Сколько новостей обрабатывается одновременно
+        self.markdown = NaukaRfMarkdown(self.base_url)
 
     async def __aenter__(self):
-        """Асинхронный контекстный менеджер - вход"""
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        await super().__aenter__()
+        if self.use_category_cache:
+            self.category_cache = CategoryCache()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Асинхронный контекстный менеджер - выход"""
-        if self.session:
-            await self.session.close()
+        await super().__aexit__(exc_type, exc_val, exc_tb)
+        if self.category_cache:
+            # self.logger показывает только ошибки, статистику выводим вместе со статистикой HTTP-кэша
+            logging.getLogger(BaseParser.__module__).info(
+                f"[{self.source_name}] Кэш категорий: {self.category_cache.summary()}"
+            )
+            self.category_cache.close()
+            self.category_cache = None
 
-    async def _parse_date(self, date_str: str) -> str:
+    @property
+    def source_name(self) -> str:
+        """Возвращает название источника новостей"""
+        return "наука.рф"
+
+    def _parse_date(self, date_str: str) -> str:
         """
         Преобразует строку даты в формат YYYY-MM-DD
         Вход: "5 апреля 2025"
@@ -98,11 +151,15 @@ class NaukaRfParser(BaseParser):
         link = item['url']
         # self.logger.info(f"Ссылка: {link}")
         
-        date = await self._parse_date(item['date'])
+        date = self._parse_date(item['date'])
         # self.logger.info(f"Дата: {date}")
         
-        # Определяем категорию
-        category = await self._get_category(title)
+        # Определяем категорию и получаем детали новости параллельно
+        url = f"{self.base_url}{link}"
+        category, details = await asyncio.gather(
+            self._get_category(title),
+            self.get_news_detail(url)
+        )
         self.logger.info(f"Категория: {category}")
         
         # Формируем структуру новости
@@ -114,9 +171,6 @@ class NaukaRfParser(BaseParser):
             'author': 'наука.рф'
         }
         
-        # Получаем детали новости
-        url = f"{self.base_url}{link}"
-        details = await self.get_news_detail(url)
         if details:
             news_item['description'] = details['description']
             # Выводим часть контента для проверки
@@ -130,147 +184,220 @@ class NaukaRfParser(BaseParser):
         
         return news_item
 
-    def set_send_callback(self, callback):
-        """Устанавливает функцию для отправки данных"""
-        self._send_callback = callback
-
-    async def _send_batch(self) -> bool:
-        """Отправляет накопленный пакет новостей"""
-        if len(self.news_buffer) >= self.batch_size and self._send_callback:
-            batch = self.news_buffer[:self.batch_size]
-            self.news_buffer = self.news_buffer[self.batch_size:]
-            return await self._send_callback(batch)
-        return True
+    async def _fetch_listing(self, page: int) -> Optional[List[Dict]]:
+        """Получает новости со страницы AJAX-списка; None, если страницу получить не удалось"""
+        url = self.api_url.format(page)
+        
+        status, text = await self._get_cached(url, stage='listing')
+        if status == 304:
+            # Страница не изменилась с прошлого запуска - новых новостей нет
+            return []
+        if status != 200:
+            self.logger.error(f"Ошибка при получении страницы {page}: {status}")
+            return None
+            
+        with self._track('parse'):
+            data = json.loads(text)
+        return data.get('ITEMS') or []
 
-    async def get_news(self, initial_load: bool = False, pages: int = 2) -> List[Dict]:
-        """Получает список новостей с сайта наука.рф"""
+    async def get_news(
+        self,
+        initial_load: bool = False,
+        pages: int = 2,
+        is_known: Optional[Callable[[str], bool]] = None,
+        checkpoint=None
+    ) -> List[Dict]:
+        """
+        Получает список новостей с сайта наука.рф.
+        Если передан is_known(link), обход инкрементальный: известные ссылки
+        пропускаются до классификации и загрузки деталей.
+        checkpoint (CrawlCheckpoint) позволяет продолжить прерванную первичную загрузку.
+        """
         all_news = []
-        current_page = 1
+        pages_to_parse = pages if initial_load or is_known else 1
+        if self.category_cache:
+            # Категории другой версии модели не должны попасть в новости
+            await self._refresh_model_version()
+        # В обычном режиме неизмененные страницы списка пропускаются без разбора
+        self.revalidate = not initial_load
         
+        # Новости страницы обрабатываются конвейером ширины pipeline_width,
+        # а в буфер отправки попадают в порядке источника
+        scheduler = CrawlScheduler(
+            self._fetch_listing,
+            self._process_news_item,
+            on_item=self._emit,
+            workers=self.pipeline_width,
+            ordered=True,
+            is_known=(lambda item: is_known(item['url'])) if is_known else None,
+            is_duplicate=lambda item: self._is_duplicate(item['url'], item['title']),
+            checkpoint=checkpoint,
+            item_key=lambda item: item['url'],
+            on_page=self._classify_page
+        )
         try:
-            while current_page <= pages:
-                url = self.api_url.format(current_page)
-                
-                async with self.session.get(url) as response:
-                    if response.status != 200:
-                        self.logger.error(f"Ошибка при получении страницы {current_page}")
-                        break
-                        
-                    data = await response.json()
-                    if not data.get('ITEMS'):
-                        break
-                    
-                    # Обработка каждой новости на странице
-                    for item in data['ITEMS']:
-                        processed_news = await self._process_news_item(item)
-                        all_news.append(processed_news)
-                        self.news_buffer.append(processed_news)
-                        
-                        # Отправляем пакет, если накопилось достаточно новостей
-                        await self._send_batch()
-                    
-                    current_page += 1
-                    
-                    if not initial_load and current_page > 1:
-                        break
-                        
+            all_news = await scheduler.run(pages_to_parse)
         except Exception as e:
             self.logger.error(f"Ошибка при получении новостей: {str(e)}")
-            
-        # Отправляем оставшиеся новости
-        if self.news_buffer:
-            await self._send_batch()
-            self.news_buffer = []
+        finally:
+            for task in set(self._page_categories.values()):
+                task.cancel()
+            self._page_categories.clear()
+        self._record_crawl(scheduler)
             
         return all_news
 
     async def get_news_detail(self, url: str) -> Dict:
-        """Получает детальную информацию о новости"""
+        """
+        Получает детальную информацию о новости; None, если ее нет.
+        Временные ошибки (таймаут, 429/5xx после повторов, хост выключен
+        предохранителем) выбрасываются, чтобы новость была запрошена снова.
+        """
         self.logger.info(f"Получение деталей новости: {url}")
+        self.logger.debug(f"Отправка GET запроса к {url}")
+        status, html = await self._get_cached(url)
+        if status in RETRY_STATUSES:
+            raise RetryableStatusError(url, status)
+        if status != 200:
+            self.logger.error(f"Ошибка при получении деталей новости: {status}")
+            return None
+        
         try:
-            self.logger.debug(f"Отправка GET запроса к {url}")
-            async with self.session.get(url) as response:
-                if response.status != 200:
-                    self.logger.error(f"Ошибка при получении деталей новости: {response.status}")
-                    return None
-                
-                html = await response.text()
-                # self.logger.debug(f"Получен ответ, длина HTML: {len(html)}")
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Получаем заголовок
-                title = soup.find('h1', class_='u-inner-header__title')
-                title = title.text.strip() if title else ""
-                # self.logger.debug(f"Найден заголовок: {title}")
-                
-                # Получаем дату
-                date_elem = soup.find('time', class_='u-news-detail__date')
-                date = await self._parse_date(date_elem.text.strip()) if date_elem else None
-                # self.logger.debug(f"Найдена дата: {date}")
-                
-                # Получаем контент
-                content_div = soup.find('div', class_='u-news-detail-page__text-content')
-                if not content_div:
-                    # self.logger.error("Не найден основной контент новости")
-                    return None
-                    
-                markdown_content = []
-                
-                # Обработка интро
-                intro = content_div.find('b')
-                if intro:
-                    intro_text = intro.text.strip()
-                    markdown_content.append(f"**{intro_text}**\n")
-                    # self.logger.debug("Обработан интро текст")
-                
-                # Обработка изображений и текста
-                image_count = 0
-                previous_was_image = False
-                
-                for element in content_div.find_all(['p', 'br', 'img-wyz']):
-                    if element.name == 'img-wyz':
-                        src = element.get('src', '')
-                        if src:
-                            image_count += 1
-                            # self.logger.debug(f"Найдено изображение {image_count}: {src}")
-                            if not previous_was_image:
-                                markdown_content.append("")
-                            markdown_content.append(f"![image]({src})")
-                            previous_was_image = True
-                    elif element.name == 'p':
-                        text = element.text.strip()
-                        if text:
-                            if previous_was_image:
-                                markdown_content.append("")
-                            markdown_content.append(text)
-                            previous_was_image = False
-                
-                # Объединяем контент с одним переносом строки между элементами
-                content = '\n'.join(markdown_content)
-                # Убираем множественные переносы строк (более двух)
-                content = re.sub(r'\n{3,}', '\n\n', content)
-                
-                result = {
-                    'title': title,
-                    'date': date,
-                    'description': content
-                }
-                
-                self.logger.info(f"Успешно обработана новость: {title}")
-                return result
-                
+            # self.logger.debug(f"Получен ответ, длина HTML: {len(html)}")
+            # Разбор - в пуле процессов, загрузки остальных страниц не ждут
+            return await self._parse_detail(html)
+            
         except Exception as e:
             # self.logger.error(f"Ошибка при парсинге деталей новости {url}: {str(e)}", exc_info=True)
             return None
 
+    def parse_news_detail(self, html: str) -> Optional[Dict]:
+        """Извлекает заголовок, дату и контент новости из HTML детальной страницы"""
+        soup = self.extractor.parse(html, parse_only=DETAIL_ELEMENTS)
+        
+        # Получаем заголовок
+        title = soup.find('h1', class_='u-inner-header__title')
+        title = title.text.strip() if title else ""
+        # self.logger.debug(f"Найден заголовок: {title}")
+        
+        # Получаем дату
+        date_elem = soup.find('time', class_='u-news-detail__date')
+        date = self._parse_date(date_elem.text.strip()) if date_elem else None
+        # self.logger.debug(f"Найдена дата: {date}")
+        
+        # Получаем контент
+        content_div = soup.find('div', class_='u-news-detail-page__text-content')
+        if not content_div:
+            # self.logger.error("Не найден основной контент новости")
+            return None
+            
+        # Интро, абзацы и изображения за один обход контента
+        blocks = []
+        intro = content_div.find('b')
+        if intro:
+            blocks.append((INTRO, f"**{self.markdown.inline(intro)}**\n"))
+        self.markdown.render_blocks(content_div, blocks)
+        content = self.markdown.join(blocks)
+        
+        result = {
+            'title': title,
+            'date': date,
+            'description': content
+        }
+        
+        self.logger.info(f"Успешно обработана новость: {title}")
+        return result
+
+    def _classify_page(self, items: List[Dict]) -> None:
+        """
+        Запускает классификацию заголовков страницы одним запросом к
+        /predict/batch; _get_category новостей страницы дожидается его результата.
+        """
+        if not self._batch_supported:
+            return
+        titles = list(dict.fromkeys(
+            item['title'] for item in items
+            if item['title'] not in self._page_categories
+            and not (self.category_cache and item['title'] in self.category_cache)
+        ))
+        if not titles:
+            return
+        task = asyncio.create_task(self._request_categories(titles))
+        for title in titles:
+            self._page_categories[title] = task
+
     async def _get_category(self, title: str) -> str:
         """Определяет категорию новости через API classifier-api"""
-        # Проверяем кэш
-        if title in self._category_cache:
-            return self._category_cache[title]
+        # Заголовок классифицируется вместе со своей страницей
+        batch = self._page_categories.pop(title, None)
+        if batch is not None:
+            if self.category_cache:
+                self.category_cache.misses += 1
+            CACHE_LOOKUPS.inc(self.source_name, 'category', 'miss')
+            categories = await batch
+            if categories and title in categories:
+                return categories[title]
+        else:
+            # Проверяем кэш
+            category = self.category_cache.get(title) if self.category_cache else None
+            if category is not None:
+                CACHE_LOOKUPS.inc(self.source_name, 'category', 'hit')
+                return category
+            CACHE_LOOKUPS.inc(self.source_name, 'category', 'miss')
         
+        with self._track('classify'):
+            return await self._request_category(title)
+
+    async def _request_categories(self, titles: List[str]) -> Optional[Dict[str, str]]:
+        """Запрашивает категории списка заголовков у classifier-api одним запросом"""
         try:
-            async with self.session.post(
+            with self._track('classify'):
+                async with self._request(
+                    'POST',
+                    self.ML_BATCH_URL,
+                    json={
+                        "texts": titles
+                    },
+                    headers={"Content-Type": "application/json"}
+                ) as response:
+                    if response.status == 404:
+                        # Старая версия classifier-api: дальше классифицируем по одному
+                        self.logger.warning("classifier-api не поддерживает /predict/batch")
+                        self._batch_supported = False
+                        return None
+                    if response.status != 200:
+                        self.logger.error(f"Ошибка при пакетной классификации: {response.status}")
+                        return None
+                    
+                    result = await response.json()
+            
+            predictions = result.get("predictions") or []
+            if len(predictions) != len(titles):
+                self.logger.error(f"classifier-api вернул {len(predictions)} категорий на {len(titles)} заголовков")
+                return None
+            categories = {
+                title: prediction.get("prediction", "Новости Фонда")
+                for title, prediction in zip(titles, predictions)
+            }
+            if self.category_cache:
+                self.category_cache.put_many(categories, result.get("model_version"))
+            return categories
+            
+        except asyncio.TimeoutError:
+            self.logger.warning("Таймаут при пакетном запросе к classifier-api")
+            return None
+        except aiohttp.ClientError as e:
+            self.logger.warning(f"Ошибка соединения с classifier-api: {str(e)}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Неожиданная ошибка: {str(e)}")
+            return None
+
+    async def _request_category(self, title: str) -> str:
+        """Запрашивает категорию заголовка у classifier-api"""
+        try:
+            async with self._request(
+                'POST',
                 self.ML_API_URL,
                 json={
                     "text": title
@@ -283,6 +410,8 @@ class NaukaRfParser(BaseParser):
                 
                 result = await response.json()
                 category = result.get("prediction", "Новости Фонда")
+                if self.category_cache:
+                    self.category_cache.put(title, category, result.get("model_version"))
                 
                 # Валидация полученной категории
                 return category
@@ -297,3 +426,14 @@ class NaukaRfParser(BaseParser):
             self.logger.error(f"Неожиданная ошибка: {str(e)}")
             return "Новости Фонда"
 
+    async def _refresh_model_version(self) -> None:
+        """Узнает версию модели у classifier-api; при ее смене кэш категорий сбрасывается"""
+        try:
+            async with self._request('GET', f"{self.ML_BASE_URL}/") as response:
+                if response.status != 200:
+                    return
+                result = await response.json()
+            self.category_cache.set_model_version(result.get("model_version"))
+        except Exception as e:
+            # Версию узнаем из ответов на запросы категорий
+            self.logger.warning(f"Не удалось получить версию модели classifier-api: {str(e)}")
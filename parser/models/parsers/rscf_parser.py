@@ -1,18 +1,46 @@
 from datetime import datetime
 import re
-from typing import Dict, List, Any, Optional
-from bs4 import BeautifulSoup, Tag
-from requests import get
-import asyncio
-import aiohttp
+from typing import Callable, Dict, List, Any, Optional
+from bs4 import SoupStrainer, Tag
 import logging
 import json
 
 from ..base_parser import BaseParser
+from ..crawler import CrawlScheduler
+from ..markdown import IMAGE, PARAGRAPH, MarkdownRenderer
 from config import MONTHS
+from utils.http_policy import RETRY_STATUSES, RetryableStatusError
+
+# Элементы страниц, которые нужны для извлечения новостей
+LISTING_ELEMENTS = SoupStrainer('div', class_='news-item')
+DETAIL_ELEMENTS = SoupStrainer(['span', 'div'], class_=[
+    'news-date-time',
+    'news-date',
+    'b-news-detail-date',
+    'b-news-detail-picture',
+    'news-detail-intro',
+    'b-news-detail-content',
+])
+
+class RscfMarkdown(MarkdownRenderer):
+    """Markdown детальной страницы rscf.ru"""
+
+    def image_source(self, element: Tag) -> Optional[str]:
+        # Изображение - <img> или блок <div> с классом b-news-detail-picture
+        if element.name not in ('img', 'div') or element.get('class') != ['b-news-detail-picture']:
+            return None
+        img = element if element.name == 'img' else element.find('img')
+        img_src = img.get('src') if img else None
+        if not img_src:
+            return None
+        if img_src.startswith('/'):
+            img_src = f"{self.base_url}{img_src}"
+        return img_src
+
 
 class RscfParser(BaseParser):
-    def __init__(self):
+    def __init__(self, **pool_options):
+        super().__init__(**pool_options)
         self.base_url = "https://rscf.ru/news/"
         self.categories = {
             'all': '',
@@ -22,39 +50,15 @@ class RscfParser(BaseParser):
             'release': 'release/'
         }
         self.months = MONTHS
-        self.session = None
-        self.news_buffer = []
-        self.batch_size = 10
-        self._send_callback = None  # Добавляем атрибут для колбэка
-        
+        self.markdown = RscfMarkdown("https://rscf.ru")
         # Настройка логгера с отключенным выводом
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.ERROR)  # Показывать только ошибки
     
-    def set_send_callback(self, callback):
-        """Устанавливает функцию для отправки данных"""
-        self._send_callback = callback
-
-    async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
-    
     @property
     def source_name(self) -> str:
         return "РНФЦ"
 
-    async def _send_batch(self) -> bool:
-        """Отправляет накопленный пакет новостей"""
-        if len(self.news_buffer) >= self.batch_size and self._send_callback:
-            batch = self.news_buffer[:self.batch_size]
-            self.news_buffer = self.news_buffer[self.batch_size:]
-            return await self._send_callback(batch)
-        return True
-
     async def _process_news_item(self, news: Dict, details: Dict) -> Dict:
         """Обрабатывает и объединяет базовую информацию с деталями новости"""
         if details:
@@ -62,156 +66,144 @@ class RscfParser(BaseParser):
             return news
         return None
 
-    async def get_news(self, initial_load: bool = False, pages: int = 10) -> List[Dict[str, str]]:
-        """Получает и обрабатывает новости"""
+    async def _fetch_listing(self, page: int) -> Optional[List[Dict]]:
+        """Получает заготовки новостей со страницы списка"""
+        url = f"{self.base_url}?PAGEN_2={page}"
+        self.logger.info(f"Обработка страницы {page}: {url}")
+        
+        status, html = await self._get_cached(url, stage='listing')
+        if status == 304:
+            # Страница не изменилась с прошлого запуска - новых новостей нет
+            return []
+        if status != 200:
+            self.logger.error(f"Ошибка при получении страницы {page}: {status}")
+            return None
+        
+        with self._track('parse'):
+            soup = self.extractor.parse(html, parse_only=LISTING_ELEMENTS)
+            
+            news_items = []
+            for item in soup.find_all('div', class_='news-item'):
+                news = {
+                    'title': item.find('a', class_='news-title').text.strip(),
+                    'category': item.find('a', class_='news-category').text.strip(),
+                    'link': item.find('a', class_='news-title')['href'],
+                    'author': 'РНФ'  # Добавляем автора сразу
+                }
+                news_items.append(news)
+        return news_items
+
+    async def _fetch_item(self, news: Dict) -> Optional[Dict]:
+        """Получает детали новости и объединяет их с базовой информацией"""
+        details = await self.get_news_detail(news['link'])
+        return await self._process_news_item(news, details)
+
+    async def get_news(
+        self,
+        initial_load: bool = False,
+        pages: int = 10,
+        is_known: Optional[Callable[[str], bool]] = None,
+        checkpoint=None
+    ) -> List[Dict[str, str]]:
+        """
+        Получает и обрабатывает новости.
+        Если передан is_known(link), обход инкрементальный: известные ссылки
+        пропускаются без загрузки деталей, и страницы листаются до первой
+        серии уже обработанных новостей.
+        checkpoint (CrawlCheckpoint) позволяет продолжить прерванную первичную загрузку.
+        """
         all_news = []
-        pages_to_parse = pages if initial_load else 1
+        pages_to_parse = pages if initial_load or is_known else 1
+        # В обычном режиме неизмененные страницы списка пропускаются без разбора
+        self.revalidate = not initial_load
         
+        # Страницы списка загружаются наперед, детали - общим пулом воркеров
+        scheduler = CrawlScheduler(
+            self._fetch_listing,
+            self._fetch_item,
+            on_item=self._emit,
+            workers=self.detail_workers,
+            is_known=(lambda news: is_known(news['link'])) if is_known else None,
+            is_duplicate=lambda news: self._is_duplicate(news['link'], news['title']),
+            checkpoint=checkpoint,
+            item_key=lambda news: news['link']
+        )
         try:
-            async with aiohttp.ClientSession() as session:
-                for page in range(1, pages_to_parse + 1):
-                    url = f"{self.base_url}?PAGEN_2={page}"
-                    self.logger.info(f"Обработка страницы {page}: {url}")
-                    
-                    async with session.get(url) as response:
-                        if response.status != 200:
-                            self.logger.error(f"Ошибка при получении страницы {page}: {response.status}")
-                            continue
-                            
-                        html = await response.text()
-                        soup = BeautifulSoup(html, "html.parser")
-                        
-                        news_items = []
-                        for item in soup.find_all('div', class_='news-item'):
-                            news = {
-                                'title': item.find('a', class_='news-title').text.strip(),
-                                'category': item.find('a', class_='news-category').text.strip(),
-                                'link': item.find('a', class_='news-title')['href'],
-                                'author': 'РНФ'  # Добавляем автора сразу
-                            }
-                            news_items.append(news)
-                        
-                        # Асинхронно получаем детали для всех новостей на странице
-                        tasks = [self.get_news_detail(news['link']) for news in news_items]
-                        details_list = await asyncio.gather(*tasks)
-                        
-                        # Объединяем базовую информацию с деталями
-                        for news, details in zip(news_items, details_list):
-                            processed_news = await self._process_news_item(news, details)
-                            if processed_news:
-                                all_news.append(processed_news)
-                                self.news_buffer.append(processed_news)
-                                
-                                # Отправляем пакет, если накопилось достаточно новостей
-                                await self._send_batch()
-                
+            all_news = await scheduler.run(pages_to_parse)
         except Exception as e:
             self.logger.error(f"Ошибка при получении новостей: {str(e)}")
-        
-        # Отправляем оставшиеся новости
-        if self.news_buffer and self._send_callback:
-            await self._send_callback(self.news_buffer)
-            self.news_buffer = []
+        self._record_crawl(scheduler)
         
         return all_news
 
     async def get_news_detail(self, url: str) -> Dict[str, Any]:
-        """Получает детальную информацию о новости"""
+        """
+        Получает детальную информацию о новости; None, если ее нет.
+        Временные ошибки (таймаут, 429/5xx после повторов, хост выключен
+        предохранителем) выбрасываются, чтобы новость была запрошена снова.
+        """
         if not url.startswith('http'):
             url = f"https://rscf.ru{url if url.startswith('/') else f'/{url}'}"
         
+        status, html = await self._get_cached(url)
+        if status in RETRY_STATUSES:
+            raise RetryableStatusError(url, status)
+        if status != 200:
+            self.logger.error(f"Ошибка при получении деталей новости: {status}")
+            return None
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        self.logger.error(f"Ошибка при получении деталей новости: {response.status}")
-                        return None
-                    
-                    html = await response.text()
-                    soup = BeautifulSoup(html, "html.parser")
-                    
-                    # Получаем дату
-                    date_time_elem = (
-                        soup.find('span', class_='news-date-time') or 
-                        soup.find('div', class_='news-date') or
-                        soup.find('div', class_='b-news-detail-date')
-                    )
-                    
-                    news_datetime = None
-                    if date_time_elem:
-                        date_time_text = date_time_elem.text.strip()
-                        date_match = re.search(r'(\d+\s+\w+,\s+\d+)', date_time_text)
-                        if date_match:
-                            news_datetime = self._parse_date(date_match.group(1))
-                    
-                    # Формируем контент
-                    markdown_content = []
-                    
-                    # Обработка главного изображения
-                    main_image = soup.find('div', class_='b-news-detail-picture')
-                    if main_image and main_image.find('img'):
-                        img_src = main_image.find('img').get('src', '')
-                        if img_src:
-                            if img_src.startswith('/'):
-                                img_src = f"https://rscf.ru{img_src}"
-                            markdown_content.append(f"![image]({img_src})")
-                    
-                    # Обработка интро
-                    intro = soup.find('div', class_='news-detail-intro')
-                    if intro:
-                        intro_text = self._process_links(intro)
-                        markdown_content.append(f"**{intro_text}**")
-                    
-                    # Обработка основного контента
-                    content_block = soup.find('div', class_='b-news-detail-content')
-                    if content_block:
-                        for element in content_block.find_all(['p', 'blockquote', 'img', 'div']):
-                            if element.name in ['img', 'div'] and element.get('class') == ['b-news-detail-picture']:
-                                img = element if element.name == 'img' else element.find('img')
-                                if img and img.get('src'):
-                                    img_src = img.get('src')
-                                    if img_src.startswith('/'):
-                                        img_src = f"https://rscf.ru{img_src}"
-                                    markdown_content.append(f"![image]({img_src})")
-                            elif element.name == 'blockquote':
-                                quote_text = self._process_links(element)
-                                markdown_content.append(f"> {quote_text}")
-                            elif element.name == 'p' and not element.find_parent('blockquote'):
-                                text = self._process_links(element)
-                                markdown_content.append(text)
-                    
-                    # Объединяем контент
-                    content = '\n\n'.join(markdown_content)
-                    
-                    return {
-                        'date': news_datetime,
-                        'description': content,
-                        'author': 'РНФЦ'
-                    }
-                    
+            # Разбор - в пуле процессов, загрузки остальных страниц не ждут
+            return await self._parse_detail(html)
         except Exception as e:
             self.logger.error(f"Ошибка при парсинге деталей новости {url}: {str(e)}")
             return None
 
-    def _process_links(self, element: Tag) -> str:
-        text = element.text.strip()
-        links = element.find_all('a')
+    def parse_news_detail(self, html: str) -> Dict[str, Any]:
+        """Извлекает дату и контент новости из HTML детальной страницы"""
+        soup = self.extractor.parse(html, parse_only=DETAIL_ELEMENTS)
         
-        if not links:
-            return text
-            
-        for link in links:
-            link_text = link.text.strip()
-            link_url = link.get('href', '')
-            
-            if link_url.startswith('/'):
-                link_url = f"https://rscf.ru{link_url}"
-            elif not link_url.startswith(('http://', 'https://')):
-                link_url = f"https://rscf.ru/{link_url}"
-                
-            text = text.replace(link_text, f"[{link_text}]({link_url})")
-            
-        return text
+        # Получаем дату
+        date_time_elem = (
+            soup.find('span', class_='news-date-time') or 
+            soup.find('div', class_='news-date') or
+            soup.find('div', class_='b-news-detail-date')
+        )
+        
+        news_datetime = None
+        if date_time_elem:
+            date_time_text = date_time_elem.text.strip()
+            date_match = re.search(r'(\d+\s+\w+,\s+\d+)', date_time_text)
+            if date_match:
+                news_datetime = self._parse_date(date_match.group(1))
+        
+        # Формируем контент
+        blocks = []
+        
+        # Обработка главного изображения
+        main_image = soup.find('div', class_='b-news-detail-picture')
+        if main_image and main_image.find('img'):
+            img_src = main_image.find('img').get('src', '')
+            if img_src:
+                if img_src.startswith('/'):
+                    img_src = f"https://rscf.ru{img_src}"
+                blocks.append((IMAGE, f"![image]({img_src})"))
+        
+        # Обработка интро
+        intro = soup.find('div', class_='news-detail-intro')
+        if intro:
+            blocks.append((PARAGRAPH, f"**{self.markdown.inline(intro)}**"))
+        
+        # Обработка основного контента: абзацы, цитаты, ссылки и изображения за один обход
+        content_block = soup.find('div', class_='b-news-detail-content')
+        if content_block:
+            self.markdown.render_blocks(content_block, blocks)
+        
+        return {
+            'date': news_datetime,
+            'description': self.markdown.join(blocks),
+            'author': 'РНФЦ'
+        }
 
     def _parse_date(self, date_str: str) -> str:
         """
@@ -1,3 +1,3 @@
 #!/bin/bash
-cron
-tail -f /var/log/cron.log
+# Парсер работает постоянно и сам повторяет циклы (см. DAEMON_INTERVAL в config.py)
+exec python /app/daemon.py
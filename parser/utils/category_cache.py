@@ -0,0 +1,141 @@
+import hashlib
+import logging
+import sqlite3
+import time
+from typing import Dict, Optional
+
+from config import CATEGORY_CACHE_PATH, CATEGORY_CACHE_SIZE
+from utils.sqlite_db import connect
+
+logger = logging.getLogger(__name__)
+
+
+def title_key(title: str) -> str:
+    """Ключ кэша: хэш заголовка без различий в регистре и пробелах"""
+    normalized = ' '.join(title.lower().split())
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class CategoryCache:
+    """
+    Дисковый LRU-кэш категорий заголовков, ограниченный max_entries записями.
+    Каждая запись помечена версией модели classifier-api: при смене версии
+    записи старой модели удаляются, а записи других версий не выдаются.
+    """
+
+    def __init__(self, path: str = CATEGORY_CACHE_PATH, max_entries: int = CATEGORY_CACHE_SIZE):
+        self._db = connect(path, isolation_level=None)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS category_cache (
+                key TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                model_version TEXT,
+                used_at REAL
+            )
+        ''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS category_cache_used_at ON category_cache (used_at)')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS category_cache_meta (
+                name TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        row = self._db.execute(
+            "SELECT value FROM category_cache_meta WHERE name = 'model_version'"
+        ).fetchone()
+        self.model_version: Optional[str] = row[0] if row else None
+        self.max_entries = max_entries
+        self._size = self._db.execute('SELECT COUNT(*) FROM category_cache').fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    def __contains__(self, title: str) -> bool:
+        """Есть ли категория заголовка (без учета в счетчиках и LRU)"""
+        return self._db.execute(
+            'SELECT 1 FROM category_cache WHERE key = ? AND model_version IS ?',
+            (title_key(title), self.model_version)
+        ).fetchone() is not None
+
+    def get(self, title: str) -> Optional[str]:
+        """Возвращает категорию заголовка и отмечает ее как недавно использованную"""
+        key = title_key(title)
+        row = self._db.execute(
+            'SELECT category FROM category_cache WHERE key = ? AND model_version IS ?',
+            (key, self.model_version)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._db.execute('UPDATE category_cache SET used_at = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+
+    def put_many(self, categories: Dict[str, str], model_version: Optional[str] = None) -> None:
+        """Сохраняет категории заголовков, полученные от модели model_version"""
+        if model_version:
+            self.set_model_version(model_version)
+        if not categories:
+            return
+        now = time.time()
+        try:
+            self._db.execute('BEGIN')
+            self._db.executemany(
+                'INSERT OR REPLACE INTO category_cache (key, category, model_version, used_at) VALUES (?, ?, ?, ?)',
+                [(title_key(title), category, self.model_version, now) for title, category in categories.items()]
+            )
+            self._db.execute('COMMIT')
+        except sqlite3.Error as e:
+            self._db.execute('ROLLBACK')
+            logger.error(f"Ошибка при сохранении категорий в кэш: {e}")
+            return
+        self._size += len(categories)
+        if self._size > self.max_entries:
+            self._evict()
+
+    def put(self, title: str, category: str, model_version: Optional[str] = None) -> None:
+        self.put_many({title: category}, model_version)
+
+    def _evict(self) -> None:
+        """Удаляет давно не использованные записи сверх max_entries"""
+        # Файл может быть общим для нескольких процессов - пересчитываем размер
+        self._size = self._db.execute('SELECT COUNT(*) FROM category_cache').fetchone()[0]
+        excess = self._size - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                'DELETE FROM category_cache WHERE key IN '
+                '(SELECT key FROM category_cache ORDER BY used_at LIMIT ?)',
+                (excess,)
+            )
+            self._size -= excess
+
+    def set_model_version(self, model_version: Optional[str]) -> None:
+        """Запоминает версию модели; при ее смене удаляет категории прежних версий"""
+        if not model_version or model_version == self.model_version:
+            return
+        deleted = self._db.execute(
+            'DELETE FROM category_cache WHERE model_version IS NOT ?', (model_version,)
+        ).rowcount
+        self._db.execute(
+            "INSERT OR REPLACE INTO category_cache_meta (name, value) VALUES ('model_version', ?)",
+            (model_version,)
+        )
+        if self.model_version is not None:
+            logger.info(
+                f"Версия модели classifier-api изменилась ({self.model_version} -> {model_version}), "
+                f"сброшено категорий: {deleted}"
+            )
+        self.invalidated += deleted
+        self._size = self._db.execute('SELECT COUNT(*) FROM category_cache').fetchone()[0]
+        self.model_version = model_version
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0.0
+        return (
+            f"попаданий: {self.hits}, промахов: {self.misses} ({ratio:.0%}), записей: {self._size}, "
+            f"версия модели: {self.model_version or 'неизвестна'}, сброшено: {self.invalidated}"
+        )
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Set
+
+from config import JSON_DIR, CHECKPOINT_INTERVAL
+from utils.link_store import LinkStore
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlCheckpoint:
+    """
+    Контрольная точка первичной загрузки источника.
+
+    Ссылка считается отправленной, как только ее пакет записан в журнал
+    отправки (Outbox): с этого момента доставку гарантирует журнал, а ссылка
+    сразу добавляется в хранилище обработанных ссылок. Страница завершена,
+    когда каждая ее новость либо отправлена, либо отброшена. Номера
+    завершенных страниц периодически сохраняются в JSON атомарной заменой файла.
+
+    При возобновлении завершенные страницы не запрашиваются, а уже
+    отправленные новости незавершенных страниц пропускаются до загрузки деталей.
+    """
+
+    def __init__(self, source: str, links: LinkStore, interval: float = CHECKPOINT_INTERVAL):
+        self.source = source
+        self.links = links
+        self.interval = interval
+        self.path = os.path.join(JSON_DIR, f"checkpoint_{source}.json")
+        self.completed_pages: Set[int] = set()
+        self._remaining: Dict[int, Set[str]] = {}  # Неразрешенные ссылки незавершенных страниц
+        self._page_of: Dict[str, int] = {}
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+        self._load()
+        self.resumed_pages = len(self.completed_pages)
+
+    def _load(self) -> None:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.completed_pages = set(json.load(f).get('completed_pages', []))
+        except Exception as e:
+            logger.error(f"[{self.source}] Ошибка при загрузке контрольной точки: {e}")
+
+    def is_page_done(self, page: int) -> bool:
+        return page in self.completed_pages
+
+    def is_sent(self, link: str) -> bool:
+        return link in self.links
+
+    def start_page(self, page: int, links: Iterable[str]) -> None:
+        """Запоминает новости страницы, которые будут обработаны"""
+        remaining = set(links)
+        for link in remaining:
+            self._page_of[link] = page
+        self._remaining[page] = remaining
+        if not remaining:
+            self._complete(page)
+
+    def resolve(self, link: str) -> None:
+        """Новость отброшена (детали не получены или не изменились)"""
+        self._discard(link)
+        self.maybe_flush()
+
+    def mark_sent(self, items: List[Dict]) -> None:
+        """Пакет записан в журнал отправки: ссылки становятся обработанными"""
+        links = [item['link'] for item in items if item.get('link')]
+        self.links.add_many(links)
+        for link in links:
+            self._discard(link)
+        self.maybe_flush()
+
+    def _discard(self, link: str) -> None:
+        page = self._page_of.pop(link, None)
+        if page is None:
+            return
+        remaining = self._remaining.get(page)
+        if remaining is not None:
+            remaining.discard(link)
+            if not remaining:
+                self._complete(page)
+
+    def _complete(self, page: int) -> None:
+        del self._remaining[page]
+        self.completed_pages.add(page)
+        self._dirty = True
+
+    def maybe_flush(self) -> None:
+        if self._dirty and time.monotonic() - self._flushed_at >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Сохраняет завершенные страницы: запись во временный файл, fsync и os.replace"""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(JSON_DIR, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'completed_pages': sorted(self.completed_pages), 'updated_at': time.time()}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._flushed_at = time.monotonic()
+        except Exception as e:
+            logger.error(f"[{self.source}] Ошибка при сохранении контрольной точки: {e}")
+
+    def clear(self) -> None:
+        """Удаляет контрольную точку после завершения первичной загрузки"""
+        self.completed_pages.clear()
+        self._remaining.clear()
+        self._page_of.clear()
+        self._dirty = False
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except Exception as e:
+            logger.error(f"[{self.source}] Ошибка при удалении контрольной точки: {e}")
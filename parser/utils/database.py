@@ -1,127 +1,85 @@
+import asyncio
 import logging
-import aiohttp
-import json
-import sqlite3
-import os
-import aiosqlite
-import csv
-from datetime import datetime
+from typing import Optional
 
-from config import BASE_DIR
+from config import INGEST_BACKEND, LOCAL_DB_PATH, DATASET_CSV_PATH, DATASET_PARQUET_PATH
+from utils.dataset_export import DatasetWriter, export_dataset, news_rows
+from utils.ingestion_client import BatchRejectedError, IngestionClient
+from utils.sqlite_sink import SqliteNewsStore
 
 logger = logging.getLogger(__name__)
 
+_ingestion_client: Optional[IngestionClient] = None
+_local_store: Optional[SqliteNewsStore] = None
+_dataset_writer: Optional[DatasetWriter] = None
+
+def get_ingestion_client() -> IngestionClient:
+    """Возвращает общий для процесса клиент API приема новостей"""
+    global _ingestion_client
+    if _ingestion_client is None:
+        _ingestion_client = IngestionClient()
+    return _ingestion_client
+
+def get_local_store() -> SqliteNewsStore:
+    """Возвращает общую для процесса локальную базу новостей"""
+    global _local_store
+    if _local_store is None:
+        _local_store = SqliteNewsStore()
+    return _local_store
+
+async def close_ingestion() -> None:
+    """Закрывает клиент API и локальную базу, выводит статистику отправки"""
+    global _ingestion_client, _local_store, _dataset_writer
+    if _ingestion_client is not None:
+        if _ingestion_client.batches_sent or _ingestion_client.batches_failed:
+            logger.info(f"Отправка в API: {_ingestion_client.summary()}")
+        await _ingestion_client.close()
+        _ingestion_client = None
+    if _local_store is not None:
+        logger.info(f"Локальная база {_local_store.path}: добавлено {_local_store.items_inserted} новостей")
+        _local_store.close()
+        _local_store = None
+    if _dataset_writer is not None:
+        _dataset_writer.close()
+        _dataset_writer = None
+
 async def send_to_database(items: list) -> bool:
-    """Отправляет новости в базу данных через API"""
+    """Отправляет новости в базу данных через API или в локальную SQLite (INGEST_BACKEND)"""
+    if INGEST_BACKEND == 'sqlite':
+        return await send_to_database_dev(items)
+    
     logger.info(f"[{items[0].get('author', 'Unknown')}] Отправка пакета из {len(items)} новостей")
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                'http://djangoapp:8000/api-dev/news/',
-                json=items,
-                headers={'Content-Type': 'application/json'}
-            ) as response:
-                if response.status == 201:  # Успешное создание
-                    logger.info(f"Успешно отправлено {len(items)} новостей")
-                    return True
-                else:
-                    logger.error(f"Ошибка при отправке новостей: {response.status}")
-                    error_text = await response.text()
-                    logger.error(f"Ответ сервера: {error_text}")
-                    return False
-                    
+        return await get_ingestion_client().send(items)
+    except BatchRejectedError:
+        raise  # Отклоненный пакет обрабатывает журнал отправки
     except Exception as e:
         logger.error(f"Ошибка при отправке данных в БД: {str(e)}")
         return False
 
 async def send_to_database_dev(items: list) -> bool:
-    """Временный метод для сохранения новостей в SQLite"""
-    db_path = os.path.join(BASE_DIR, "rscf_news.sqlite3")
-    
-    # Убедимся, что директория существует
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    
+    """Сохраняет новости в локальную SQLite вместо API (INGEST_BACKEND = 'sqlite')"""
     try:
-        async with aiosqlite.connect(db_path) as db:
-            # Создаем таблицу, если она не существует
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS news (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    author TEXT,
-                    category TEXT,
-                    link TEXT UNIQUE,
-                    date TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Подготавливаем данные для вставки
-            for item in items:
-                try:
-                    await db.execute('''
-                        INSERT INTO news (title, description, author, category, link, date)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        item.get('title', ''),
-                        item.get('description', ''),
-                        item.get('author', ''),
-                        item.get('category', ''),
-                        item.get('link', ''),
-                        item.get('date', '')
-                    ))
-                except sqlite3.IntegrityError:
-                    # Пропускаем дубликаты (если link уже существует)
-                    logger.debug(f"Новость уже существует: {item.get('title')}")
-                    continue
-                except Exception as e:
-                    logger.error(f"Ошибка при сохранении новости: {str(e)}")
-                    continue
-            
-            await db.commit()
-            logger.info(f"Сохранено {len(items)} новостей в SQLite")
-            return True
-            
+        added = get_local_store().insert_many(items)
+        logger.info(f"Сохранено {added} новых из {len(items)} новостей в SQLite")
+        return True
     except Exception as e:
         logger.error(f"Ошибка при работе с SQLite: {str(e)}")
         return False
     
 async def save_to_csv(items: list) -> bool:
-    """Сохраняет новости в CSV файл для анализа"""
-    csv_path = os.path.join(BASE_DIR, "news_dataset.csv")
-    
+    """Дописывает новости в CSV датасет для анализа (файл открыт на весь процесс)"""
+    global _dataset_writer
     try:
-        # Создаем директорию, если её нет
-        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        if _dataset_writer is None:
+            _dataset_writer = DatasetWriter(DATASET_CSV_PATH, append=True)
         
-        # Определяем режим открытия файла (append или write)
-        file_mode = 'a' if os.path.exists(csv_path) else 'w'
-        write_header = not os.path.exists(csv_path)
+        # Записываем только заголовок и категорию
+        _dataset_writer.write(news_rows(items))
+        _dataset_writer.flush()
         
-        with open(csv_path, mode=file_mode, encoding='utf-8', newline='') as file:
-            writer = csv.writer(file, quoting=csv.QUOTE_ALL)
-            
-            # Записываем заголовок только если файл новый
-            if write_header:
-                writer.writerow(['text', 'label'])
-            
-            # Записываем данные
-            for item in items:
-                # Записываем только заголовок и категорию
-                title = item.get('title', '').strip()
-                category = item.get('category', 'Новости Фонда')
-                
-                if title:  # Проверяем, что заголовок не пустой
-                    writer.writerow([title, category])
-                
-                # Если нужно также сохранять полный текст новости
-                # description = item.get('description', '').strip()
-                # if description:  # Проверяем, что описание не пустое
-                #     writer.writerow([description, category])
-        
-        logger.info(f"Данные успешно сохранены в CSV: {csv_path}")
+        logger.info(f"Данные успешно сохранены в CSV: {DATASET_CSV_PATH}")
         return True
         
     except Exception as e:
@@ -129,39 +87,18 @@ async def save_to_csv(items: list) -> bool:
         return False
 
 # Функция для создания датасета из существующей БД SQLite
-async def create_dataset_from_db() -> bool:
-    """Создает CSV датасет из существующей базы данных SQLite"""
-    db_path = os.path.join(BASE_DIR, "rscf_news.sqlite3")
-    csv_path = os.path.join(BASE_DIR, "news_dataset.csv")
-    
+async def create_dataset_from_db(parquet: bool = True) -> bool:
+    """Создает CSV (и Parquet) датасет из локальной базы SQLite, читая ее порциями"""
     try:
-        async with aiosqlite.connect(db_path) as db:
-            async with db.execute('''
-                SELECT title, description, category 
-                FROM news 
-                WHERE category IS NOT NULL
-            ''') as cursor:
-                rows = await cursor.fetchall()
-                
-                with open(csv_path, mode='w', encoding='utf-8', newline='') as file:
-                    writer = csv.writer(file, quoting=csv.QUOTE_ALL)
-                    writer.writerow(['text', 'label'])
-                    
-                    for row in rows:
-                        # Записываем заголовок
-                        if row[0]:  # title
-                            writer.writerow([row[0].strip(), row[2]])  # title, category
-                        
-                        # Записываем описание
-                        if row[1]:  # description
-                            writer.writerow([row[1].strip(), row[2]])  # description, category
-                
-                logger.info(f"Датасет успешно создан: {csv_path}")
-                logger.info(f"Всего записей обработано: {len(rows)}")
-                return True
+        await asyncio.to_thread(
+            export_dataset,
+            LOCAL_DB_PATH,
+            DATASET_CSV_PATH,
+            DATASET_PARQUET_PATH if parquet else None
+        )
+        logger.info(f"Датасет успешно создан: {DATASET_CSV_PATH}")
+        return True
                 
     except Exception as e:
         logger.error(f"Ошибка при создании датасета: {str(e)}")
         return False
-    
-
@@ -0,0 +1,144 @@
+"""
+Потоковая выгрузка датасета для обучения классификатора из локальной базы.
+
+Строки читаются из SQLite порциями по DATASET_CHUNK_SIZE и сразу пишутся
+в CSV (text, label) и, если установлен pyarrow, в Parquet с метками
+в словарной кодировке. Память не зависит от размера таблицы.
+
+Запуск из каталога parser:
+    python -m utils.dataset_export
+    python -m utils.dataset_export --no-parquet --db /path/to/news.sqlite3
+"""
+import argparse
+import csv
+import logging
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import LOCAL_DB_PATH, DATASET_CSV_PATH, DATASET_PARQUET_PATH, DATASET_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+Row = Tuple[str, str]  # (text, label)
+
+
+class DatasetWriter:
+    """Пишет пары (text, label) в CSV и, при наличии пути и pyarrow, в Parquet"""
+
+    def __init__(self, csv_path: Optional[str], parquet_path: Optional[str] = None, append: bool = False):
+        self.rows_written = 0
+        self._csv_file = None
+        self._csv = None
+        self._parquet = None
+        self._schema = None
+
+        if csv_path:
+            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+            write_header = not (append and os.path.exists(csv_path))
+            self._csv_file = open(csv_path, 'a' if append else 'w', encoding='utf-8', newline='')
+            self._csv = csv.writer(self._csv_file, quoting=csv.QUOTE_ALL)
+            if write_header:
+                self._csv.writerow(['text', 'label'])
+
+        if parquet_path:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                logger.warning("pyarrow не установлен, Parquet не создается")
+            else:
+                os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+                self._schema = pa.schema([
+                    ('text', pa.string()),
+                    ('label', pa.dictionary(pa.int32(), pa.string())),
+                ])
+                self._parquet = pq.ParquetWriter(parquet_path, self._schema, compression='zstd')
+
+    def write(self, rows: List[Row]) -> None:
+        """Записывает порцию строк во все форматы"""
+        if not rows:
+            return
+        if self._csv is not None:
+            self._csv.writerows(rows)
+        if self._parquet is not None:
+            import pyarrow as pa
+            texts, labels = zip(*rows)
+            self._parquet.write_table(pa.Table.from_arrays(
+                [pa.array(texts, pa.string()), pa.array(labels, pa.string()).dictionary_encode()],
+                schema=self._schema,
+            ))
+        self.rows_written += len(rows)
+
+    def flush(self) -> None:
+        if self._csv_file is not None:
+            self._csv_file.flush()
+
+    def close(self) -> None:
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+
+def news_rows(items: Iterable[Dict]) -> List[Row]:
+    """Строки датасета из новостей: заголовок с категорией"""
+    rows = []
+    for item in items:
+        title = item.get('title', '').strip()
+        if title:  # Проверяем, что заголовок не пустой
+            rows.append((title, item.get('category', 'Новости Фонда')))
+    return rows
+
+
+def export_dataset(
+    db_path: str = LOCAL_DB_PATH,
+    csv_path: Optional[str] = DATASET_CSV_PATH,
+    parquet_path: Optional[str] = DATASET_PARQUET_PATH,
+    chunk_size: int = DATASET_CHUNK_SIZE,
+) -> int:
+    """
+    Выгружает датасет из таблицы news: заголовок и описание каждой новости
+    становятся отдельными строками с ее категорией. Возвращает число строк.
+    """
+    db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    writer = DatasetWriter(csv_path, parquet_path)
+    news_count = 0
+    try:
+        cursor = db.execute('''
+            SELECT title, description, category
+            FROM news
+            WHERE category IS NOT NULL
+        ''')
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                break
+            rows = []
+            for title, description, category in chunk:
+                if title:
+                    rows.append((title.strip(), category))
+                if description:
+                    rows.append((description.strip(), category))
+            writer.write(rows)
+            news_count += len(chunk)
+    finally:
+        writer.close()
+        db.close()
+
+    logger.info(f"Датасет выгружен: {news_count} новостей, {writer.rows_written} строк")
+    return writer.rows_written
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--db', default=LOCAL_DB_PATH, help="Локальная база новостей")
+    arg_parser.add_argument('--csv', default=DATASET_CSV_PATH, help="Путь CSV")
+    arg_parser.add_argument('--parquet', default=DATASET_PARQUET_PATH, help="Путь Parquet")
+    arg_parser.add_argument('--no-parquet', action='store_true', help="Не создавать Parquet")
+    arg_parser.add_argument('--chunk-size', type=int, default=DATASET_CHUNK_SIZE, help="Строк в порции чтения")
+    args = arg_parser.parse_args()
+    export_dataset(args.db, args.csv, None if args.no_parquet else args.parquet, args.chunk_size)
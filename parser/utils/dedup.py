@@ -0,0 +1,174 @@
+import hashlib
+import logging
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from config import DEDUP_PATH, DEDUP_MAX_DISTANCE, DEDUP_WINDOW_DAYS, DEDUP_REFRESH_INTERVAL
+from utils.sqlite_db import connect
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+MAX_TEXT_LENGTH = 4096  # Длиннее счетчики n-грамм (16 бит) могут переполниться
+_NON_WORD = re.compile(r'[^\w]+')
+
+# _SPREAD[j][b] раскладывает биты байта j отпечатка по 16-битным счетчикам
+_SPREAD = [
+    [sum(((byte >> k) & 1) << (16 * (8 * j + k)) for k in range(8)) for byte in range(256)]
+    for j in range(8)
+]
+
+
+def normalize(text: str) -> str:
+    """Приводит текст к виду для сравнения: регистр, ё, пунктуация, пробелы"""
+    text = text.lower().replace('ё', 'е')
+    return _NON_WORD.sub(' ', text).strip()
+
+
+def simhash(text: str, shingle: int = 3) -> int:
+    """
+    64-битный SimHash по символьным n-граммам нормализованного текста.
+    n-граммы вместо слов устойчивы к разным окончаниям и коротким заголовкам.
+    """
+    text = normalize(text)[:MAX_TEXT_LENGTH]
+    if len(text) < shingle:
+        text = text.ljust(shingle)
+
+    # Счетчики всех 64 бит складываются в одном большом целом: по 16 бит на бит
+    # отпечатка, поэтому на n-грамму приходится 8 сложений вместо 64
+    counters = 0
+    grams = len(text) - shingle + 1
+    for i in range(grams):
+        digest = hashlib.blake2b(text[i:i + shingle].encode('utf-8'), digest_size=8).digest()
+        for table, byte in zip(_SPREAD, digest):
+            counters += table[byte]
+
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        if (counters >> (16 * bit) & 0xFFFF) * 2 > grams:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def _to_signed(value: int) -> int:
+    """SQLite хранит INTEGER со знаком"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class DuplicateIndex:
+    """
+    Индекс почти-дубликатов новостей всех источников по SimHash заголовка.
+    Отпечаток делится на max_distance + 1 блоков: у отпечатков, отличающихся
+    не более чем на max_distance бит, хотя бы один блок совпадает, поэтому
+    поиск проверяет только несколько корзин. Отпечатки хранятся в SQLite
+    и загружаются в память при запуске (за последние DEDUP_WINDOW_DAYS дней);
+    отпечатки, добавленные другими процессами, подгружаются не реже чем раз
+    в DEDUP_REFRESH_INTERVAL секунд.
+    """
+
+    def __init__(
+        self,
+        path: str = DEDUP_PATH,
+        max_distance: int = DEDUP_MAX_DISTANCE,
+        window_days: float = DEDUP_WINDOW_DAYS,
+    ):
+        self.max_distance = max_distance
+        blocks = max_distance + 1
+        width = FINGERPRINT_BITS // blocks
+        # (сдвиг, маска) каждого блока; последний блок забирает остаток бит
+        self._blocks = [
+            (i * width, (1 << (width if i < blocks - 1 else FINGERPRINT_BITS - i * width)) - 1)
+            for i in range(blocks)
+        ]
+        self._buckets: List[Dict[int, List[Tuple[int, str, str]]]] = [defaultdict(list) for _ in self._blocks]
+        self._links: Dict[Tuple[str, str], int] = {}
+        self.lookups = 0
+        self.duplicates = 0
+        self._loaded_until = 0.0  # created_at последнего загруженного отпечатка
+        self._refreshed_at = 0.0
+
+        self._db = connect(path)
+        with self._db:
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    source TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    fingerprint INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (source, link)
+                ) WITHOUT ROWID
+            ''')
+            self._db.execute(
+                'DELETE FROM fingerprints WHERE created_at < ?',
+                (time.time() - window_days * 24 * 60 * 60,)
+            )
+
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._links)
+
+    def refresh(self) -> None:
+        """Загружает отпечатки, записанные после предыдущей загрузки (в том числе другими процессами)"""
+        rows = self._db.execute(
+            'SELECT source, link, fingerprint, created_at FROM fingerprints WHERE created_at >= ?',
+            (self._loaded_until,)
+        ).fetchall()
+        for source, link, fingerprint, created_at in rows:
+            if (source, link) not in self._links:
+                self._add(source, link, fingerprint & ((1 << 64) - 1))
+            self._loaded_until = max(self._loaded_until, created_at)
+        self._refreshed_at = time.monotonic()
+
+    def _add(self, source: str, link: str, fingerprint: int) -> None:
+        self._links[(source, link)] = fingerprint
+        for buckets, (shift, mask) in zip(self._buckets, self._blocks):
+            buckets[fingerprint >> shift & mask].append((fingerprint, source, link))
+
+    def find(self, fingerprint: int, exclude_source: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """Возвращает (источник, ссылку) известной новости в пределах max_distance"""
+        for buckets, (shift, mask) in zip(self._buckets, self._blocks):
+            for candidate, source, link in buckets.get(fingerprint >> shift & mask, ()):
+                if source != exclude_source and (candidate ^ fingerprint).bit_count() <= self.max_distance:
+                    return source, link
+        return None
+
+    def check(self, source: str, link: str, text: str) -> Optional[Tuple[str, str]]:
+        """
+        Проверяет новость перед дорогими этапами. Если она почти совпадает
+        с известной новостью другого источника, возвращает (источник, ссылку)
+        оригинала; иначе None. Новость не запоминается: ее могут не загрузить
+        или не передать, поэтому отпечаток записывает record после передачи.
+        Похожие заголовки одного источника - обычно разные события
+        ("Начат прием заявок..." каждый год), поэтому они не считаются дубликатами.
+        """
+        self.lookups += 1
+        if time.monotonic() - self._refreshed_at >= DEDUP_REFRESH_INTERVAL:
+            self.refresh()
+        if (source, link) in self._links:
+            return None
+
+        original = self.find(simhash(text), exclude_source=source)
+        if original:
+            self.duplicates += 1
+        return original
+
+    def record(self, source: str, link: str, text: str) -> None:
+        """Запоминает переданную новость, чтобы ее копии в других источниках считались дубликатами"""
+        if (source, link) in self._links:
+            return
+        fingerprint = simhash(text)
+        self._add(source, link, fingerprint)
+        with self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO fingerprints (source, link, fingerprint, created_at) VALUES (?, ?, ?, ?)',
+                (source, link, _to_signed(fingerprint), time.time())
+            )
+
+    def summary(self) -> str:
+        return f"проверено {self.lookups}, дубликатов {self.duplicates}, в индексе {len(self)}"
+
+    def close(self) -> None:
+        self._db.close()
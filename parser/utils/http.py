@@ -0,0 +1,101 @@
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config import (
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionStats:
+    """Статистика переиспользования соединений общего HTTP-пула"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Создает TraceConfig, который собирает статистику в этот объект"""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(self._on_dns_cache_miss)
+        return trace_config
+
+    async def _on_request_start(self, session, ctx, params):
+        self.requests += 1
+
+    async def _on_connection_create_end(self, session, ctx, params):
+        self.connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, ctx, params):
+        self.connections_reused += 1
+
+    async def _on_dns_cache_hit(self, session, ctx, params):
+        self.dns_cache_hits += 1
+
+    async def _on_dns_cache_miss(self, session, ctx, params):
+        self.dns_cache_misses += 1
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Доля запросов, обслуженных уже открытым соединением"""
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"запросов: {self.requests}, "
+            f"новых соединений: {self.connections_created}, "
+            f"переиспользовано: {self.connections_reused} "
+            f"({self.reuse_ratio:.0%}), "
+            f"DNS-кэш: {self.dns_cache_hits} попаданий / {self.dns_cache_misses} промахов"
+        )
+
+
+def create_session(
+    headers: Optional[Dict[str, str]] = None,
+    stats: Optional[ConnectionStats] = None,
+    limit: int = HTTP_POOL_LIMIT,
+    limit_per_host: int = HTTP_POOL_LIMIT_PER_HOST,
+    dns_cache_ttl: int = HTTP_DNS_CACHE_TTL,
+    keepalive_timeout: float = HTTP_KEEPALIVE_TIMEOUT,
+    timeout: float = HTTP_TIMEOUT,
+) -> aiohttp.ClientSession:
+    """Создает HTTP-сессию с пулом соединений, keep-alive и кэшем DNS"""
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=dns_cache_ttl,
+        use_dns_cache=True,
+        keepalive_timeout=keepalive_timeout,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=headers,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        trace_configs=[stats.trace_config()] if stats else None,
+    )
+
+
+def replay_url(base_url: str, url: str) -> str:
+    """
+    Переписывает адрес для сервера воспроизведения:
+    https://rscf.ru/news/?PAGEN_2=1 -> {base_url}/https/rscf.ru/news/?PAGEN_2=1
+    """
+    parts = urlsplit(url)
+    target = f"{base_url.rstrip('/')}/{parts.scheme}/{parts.netloc}{parts.path or '/'}"
+    return f"{target}?{parts.query}" if parts.query else target
@@ -0,0 +1,74 @@
+import hashlib
+import logging
+import time
+from typing import Dict, Optional
+
+from config import HTTP_CACHE_PATH
+from utils.sqlite_db import connect
+
+logger = logging.getLogger(__name__)
+
+
+def body_hash(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class HttpCache:
+    """
+    Дисковый кэш валидаторов HTTP-ответов.
+    Для каждого URL хранит ETag, Last-Modified и хэш тела ответа,
+    чтобы отправлять условные запросы и узнавать неизмененные страницы списка.
+    """
+
+    def __init__(self, path: str = HTTP_CACHE_PATH):
+        # Автокоммит: каждая запись - короткая транзакция, и несколько парсеров
+        # в одном процессе не блокируют друг друга
+        self._db = connect(path, isolation_level=None)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                updated_at REAL
+            )
+        ''')
+        self.hits = 0
+        self.misses = 0
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Возвращает заголовки If-None-Match/If-Modified-Since для URL"""
+        row = self._db.execute(
+            'SELECT etag, last_modified FROM http_cache WHERE url = ?', (url,)
+        ).fetchone()
+        headers = {}
+        if row:
+            etag, last_modified = row
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def is_unchanged(self, url: str, body: bytes) -> bool:
+        """Совпадает ли тело ответа с сохраненным для URL"""
+        row = self._db.execute(
+            'SELECT body_hash FROM http_cache WHERE url = ?', (url,)
+        ).fetchone()
+        return bool(row) and row[0] == body_hash(body)
+
+    def store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Сохраняет валидаторы ответа"""
+        self._db.execute(
+            'INSERT OR REPLACE INTO http_cache (url, etag, last_modified, body_hash, updated_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (url, etag, last_modified, body_hash(body), time.time())
+        )
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0.0
+        return f"без изменений: {self.hits}, изменено: {self.misses} ({ratio:.0%} попаданий)"
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Ответы, после которых запрос имеет смысл повторить
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Разбирает заголовок Retry-After: число секунд или HTTP-дата"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, maximum: float, retry_after: Optional[float] = None) -> float:
+    """Задержка перед повтором: экспонента с полным разбросом, не меньше Retry-After"""
+    delay = random.uniform(0, min(maximum, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, maximum))
+    return delay
+
+
+class CircuitOpenError(Exception):
+    """Запрос отклонен: хост временно выключен предохранителем"""
+
+
+class RetryableStatusError(Exception):
+    """Сервер так и не ответил успешно после всех повторов (429, 5xx): ошибка временная"""
+
+    def __init__(self, url: str, status: int):
+        super().__init__(f"{url}: {status}")
+        self.url = url
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Ограничение частоты запросов: rate запросов в секунду в среднем
+    и не более burst подряд. Ожидающие получают токены по очереди.
+    pause() останавливает выдачу на заданное время (Retry-After).
+    """
+
+    def __init__(self, rate: Optional[float], burst: int):
+        self.rate = rate  # None или 0 - без ограничения частоты
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.paused_until = 0.0
+        self.waited = 0.0  # Суммарное время ожидания токенов, сек.
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.rate and time.monotonic() >= self.paused_until:
+            return
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                if not self.rate:
+                    break
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        self.waited += time.monotonic() - started
+
+    def pause(self, seconds: float) -> None:
+        """Не выдавать токены seconds секунд; накопленный запас сгорает"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+
+class CircuitBreaker:
+    """
+    Предохранитель хоста. После threshold неудачных запросов подряд хост
+    выключается на cooldown секунд: запросы сразу завершаются CircuitOpenError.
+    Затем пропускается один пробный запрос: успех включает хост, неудача
+    выключает его снова на вдвое больший срок (не больше max_cooldown).
+    """
+
+    def __init__(self, name: str, threshold: int, cooldown: float, max_cooldown: float):
+        self.name = name
+        self.threshold = max(1, threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until: Optional[float] = None  # None - хост включен
+        self.trips = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def before_request(self) -> bool:
+        """Пропускает запрос или выбрасывает CircuitOpenError. Возвращает True для пробного запроса"""
+        if self.open_until is None:
+            return False
+        if time.monotonic() < self.open_until or self._probe_in_flight:
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} приостановлен после {self.failures} ошибок подряд")
+        self._probe_in_flight = True
+        return True
+
+    def cancel_probe(self) -> None:
+        """Пробный запрос отменен до отправки: следующий запрос станет пробным"""
+        self._probe_in_flight = False
+
+    def record(self, ok: bool, probe: bool = False) -> None:
+        """Учитывает результат запроса; probe - результат пробного запроса"""
+        if probe:
+            self._probe_in_flight = False
+        if ok:
+            if self.open_until is not None:
+                logger.info(f"{self.name}: запросы возобновлены")
+            self.failures = 0
+            self.open_until = None
+            self.cooldown = self.base_cooldown
+            return
+
+        self.failures += 1
+        if probe or (self.open_until is None and self.failures >= self.threshold):
+            if probe:
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self.open_until = time.monotonic() + self.cooldown
+            self.trips += 1
+            logger.warning(f"{self.name}: {self.failures} ошибок подряд, запросы приостановлены на {self.cooldown:.0f} сек.")
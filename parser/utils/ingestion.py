@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from config import INGEST_BATCH_SIZE, INGEST_MAX_AGE, INGEST_QUEUE_SIZE, INGEST_SENDERS
+
+logger = logging.getLogger(__name__)
+
+_CLOSE = object()  # Маркер завершения очереди
+
+
+class IngestionQueue:
+    """
+    Стадия отправки новостей, отделенная от парсеров ограниченной очередью.
+    Парсеры кладут готовые новости через put() и ждут только при заполненной
+    очереди (обратное давление). Сборщик формирует пакеты по размеру или
+    возрасту первой новости в пакете, а несколько отправителей параллельно
+    передают пакеты в send(batch) -> bool.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[Dict]], Awaitable[bool]],
+        batch_size: int = INGEST_BATCH_SIZE,
+        max_age: float = INGEST_MAX_AGE,
+        maxsize: int = INGEST_QUEUE_SIZE,
+        senders: int = INGEST_SENDERS,
+    ):
+        self.send = send
+        self.batch_size = batch_size
+        self.max_age = max_age
+        self.senders = senders
+        self._items: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        # Не больше одного готового пакета на отправителя, остальное ждет в _items
+        self._batches: asyncio.Queue = asyncio.Queue(maxsize=senders)
+        self._tasks: List[asyncio.Task] = []
+
+        self.items_sent = 0
+        self.items_failed = 0
+        self.batches_sent = 0
+        self.blocked_puts = 0  # Сколько раз производитель ждал из-за заполненной очереди
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def start(self) -> None:
+        """Запускает сборщик пакетов и отправителей"""
+        if self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._collect()))
+        self._tasks.extend(asyncio.create_task(self._sender()) for _ in range(self.senders))
+
+    async def put(self, item: Dict) -> None:
+        """Добавляет новость в очередь; ждет, если очередь заполнена"""
+        if self._items.full():
+            self.blocked_puts += 1
+        await self._items.put(item)
+
+    async def put_many(self, items: Iterable[Dict]) -> None:
+        for item in items:
+            await self.put(item)
+
+    async def close(self) -> None:
+        """Отправляет все оставшиеся новости, включая неполный пакет, и останавливает задачи"""
+        if not self._tasks:
+            return
+        await self._items.put(_CLOSE)
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+        if self.items_sent or self.items_failed:
+            logger.info(f"Отправка: {self.summary()}")
+
+    async def _collect(self) -> None:
+        """Собирает новости в пакеты по размеру или возрасту"""
+        batch: List[Dict] = []
+        deadline: Optional[float] = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = await asyncio.wait_for(self._items.get(), timeout)
+            except asyncio.TimeoutError:
+                # Пакет пролежал max_age - отправляем неполным
+                await self._batches.put(batch)
+                batch, deadline = [], None
+                continue
+
+            if item is _CLOSE:
+                break
+
+            if not batch:
+                deadline = time.monotonic() + self.max_age
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                await self._batches.put(batch)
+                batch, deadline = [], None
+
+        if batch:
+            await self._batches.put(batch)
+        for _ in range(self.senders):
+            await self._batches.put(_CLOSE)
+
+    async def _sender(self) -> None:
+        """Отправляет пакеты, пока не получит маркер завершения"""
+        while True:
+            batch = await self._batches.get()
+            if batch is _CLOSE:
+                return
+            try:
+                success = await self.send(batch)
+            except Exception as e:
+                logger.error(f"Ошибка при отправке пакета: {e}")
+                success = False
+
+            if success:
+                self.items_sent += len(batch)
+                self.batches_sent += 1
+            else:
+                self.items_failed += len(batch)
+
+    def summary(self) -> str:
+        return (
+            f"отправлено {self.items_sent} новостей в {self.batches_sent} пакетах, "
+            f"не отправлено {self.items_failed}, ожиданий из-за заполненной очереди: {self.blocked_puts}"
+        )
@@ -0,0 +1,178 @@
+import asyncio
+import gzip
+import json
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+import aiohttp
+
+from config import (
+    API_URL,
+    INGEST_GZIP_LEVEL,
+    INGEST_GZIP_MIN_SIZE,
+    INGEST_LATENCY_SAMPLES,
+    INGEST_RETRIES,
+    INGEST_BACKOFF_BASE,
+    INGEST_BACKOFF_MAX,
+    INGEST_TIMEOUT,
+    INGEST_SENDERS,
+)
+from utils.http import ConnectionStats, create_session
+from utils.http_policy import RETRY_STATUSES, backoff_delay, parse_retry_after
+from utils.metrics import INGEST_RESPONSES
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него используется стандартный json
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def dumps(data: Any) -> bytes:
+    """Сериализует данные в компактный JSON (UTF-8) через orjson, если он установлен"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Перцентиль q (0..1) по ближайшему рангу"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+class BatchRejectedError(Exception):
+    """Бэкенд отклонил пакет ответом 4xx: повторная отправка того же пакета бесполезна"""
+
+    def __init__(self, status: int, text: str):
+        super().__init__(f"{status}: {text[:200]}")
+        self.status = status
+        self.text = text
+
+
+class IngestionClient:
+    """
+    Клиент API приема новостей бэкенда.
+    Держит одну сессию с пулом соединений на весь процесс, сжимает тела
+    запросов gzip и повторяет неудачные отправки с экспоненциальной
+    задержкой и случайным разбросом, учитывая Retry-After.
+    """
+
+    def __init__(
+        self,
+        url: str = API_URL,
+        retries: int = INGEST_RETRIES,
+        backoff_base: float = INGEST_BACKOFF_BASE,
+        backoff_max: float = INGEST_BACKOFF_MAX,
+        gzip_level: int = INGEST_GZIP_LEVEL,
+        gzip_min_size: int = INGEST_GZIP_MIN_SIZE,
+        timeout: float = INGEST_TIMEOUT,
+    ):
+        self.url = url
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.gzip_level = gzip_level
+        self.gzip_min_size = gzip_min_size
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.http_stats = ConnectionStats()
+
+        self.batches_sent = 0
+        self.batches_failed = 0
+        self.retried = 0
+        self.bytes_raw = 0  # Размер JSON до сжатия
+        self.bytes_sent = 0  # Размер отправленных тел запросов
+        # Время отправки последних пакетов с учетом повторов, сек.; в фоновом режиме
+        # процесс работает неделями, поэтому хранятся только INGEST_LATENCY_SAMPLES замеров
+        self.latencies: Deque[float] = deque(maxlen=INGEST_LATENCY_SAMPLES)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Сессия привязана к циклу событий: при новом asyncio.run создаем новую
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self._loop is not loop:
+            self.session = create_session(
+                headers={'Content-Type': 'application/json'},
+                stats=self.http_stats,
+                limit_per_host=INGEST_SENDERS,  # По соединению на отправителя очереди
+                timeout=self.timeout,
+            )
+            self._loop = loop
+        return self.session
+
+    async def send(self, items: List[Dict]) -> bool:
+        """
+        Отправляет пакет новостей. Возвращает True, если бэкенд принял пакет,
+        и False, если он недоступен. Ответ 4xx (кроме 408, 425 и 429) не повторяется:
+        поднимается BatchRejectedError.
+        """
+        source = items[0].get('author', 'Unknown')
+        body = dumps(items)
+        raw_size = len(body)
+        headers = {}
+        if self.gzip_level and raw_size >= self.gzip_min_size:
+            body = gzip.compress(body, compresslevel=self.gzip_level)
+            headers['Content-Encoding'] = 'gzip'
+
+        session = self._get_session()
+        started = time.monotonic()
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                async with session.post(self.url, data=body, headers=headers) as response:
+                    INGEST_RESPONSES.inc(str(response.status))
+                    if response.status == 201:  # Успешное создание
+                        latency = time.monotonic() - started
+                        self.batches_sent += 1
+                        self.bytes_raw += raw_size
+                        self.bytes_sent += len(body)
+                        self.latencies.append(latency)
+                        logger.info(
+                            f"[{source}] Успешно отправлено {len(items)} новостей: "
+                            f"{len(body) / 1024:.1f} КБ ({raw_size / 1024:.1f} КБ до сжатия), "
+                            f"{latency:.2f} сек., попыток: {attempt + 1}"
+                        )
+                        return True
+
+                    error_text = await response.text()
+                    if response.status not in RETRY_STATUSES:
+                        logger.error(f"[{source}] Ошибка при отправке новостей: {response.status}")
+                        logger.error(f"Ответ сервера: {error_text}")
+                        if 400 <= response.status < 500:
+                            self.batches_failed += 1
+                            raise BatchRejectedError(response.status, error_text)
+                        break
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    logger.warning(f"[{source}] Бэкенд ответил {response.status}, попытка {attempt + 1}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                INGEST_RESPONSES.inc('error')
+                logger.warning(f"[{source}] Ошибка соединения при отправке: {type(e).__name__}: {e}, попытка {attempt + 1}")
+
+            if attempt < self.retries:
+                self.retried += 1
+                await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after))
+
+        self.batches_failed += 1
+        logger.error(f"[{source}] Не удалось отправить пакет из {len(items)} новостей")
+        return False
+
+    async def close(self) -> None:
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def summary(self) -> str:
+        p50 = percentile(self.latencies, 0.5)
+        p99 = percentile(self.latencies, 0.99)
+        ratio = self.bytes_sent / self.bytes_raw if self.bytes_raw else 1.0
+        return (
+            f"пакетов: {self.batches_sent}, ошибок: {self.batches_failed}, повторов: {self.retried}, "
+            f"отправлено {self.bytes_sent / 1024:.1f} КБ ({ratio:.0%} от исходного), "
+            f"задержка p50 {p50:.2f} сек., p99 {p99:.2f} сек.; {self.http_stats.summary()}"
+        )
@@ -0,0 +1,79 @@
+import logging
+import sqlite3
+import time
+from typing import Dict
+
+from config import LEASE_PATH
+from utils.sqlite_db import connect
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseStore:
+    """
+    Аренда источников на SQLite: источник обрабатывает только процесс,
+    владеющий непросроченной арендой. Захват и продление - одна транзакция
+    BEGIN IMMEDIATE, поэтому два процесса не могут взять один источник.
+
+    Журнал всегда в режиме DELETE, а не WAL: WAL требует общей памяти и не
+    работает, когда файл лежит в каталоге, общем для нескольких машин (нужны
+    работающие блокировки fcntl на файловой системе, например NFSv4).
+    Источник, перешедший к процессу на другой машине, продолжает работу
+    со своим состоянием в JSON_DIR, только если и остальные хранилища там
+    открыты с журналом DELETE (SQLITE_JOURNAL_MODE).
+    """
+
+    def __init__(self, path: str = LEASE_PATH):
+        self._db = connect(path, journal_mode='DELETE', isolation_level=None)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS leases (
+                source TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+
+    def _transaction(self, query: str, params: tuple) -> bool:
+        """Выполняет изменение в транзакции BEGIN IMMEDIATE; True, если затронута строка"""
+        try:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                changed = self._db.execute(query, params).rowcount > 0
+                self._db.execute('COMMIT')
+                return changed
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка при работе с арендой источников: {e}")
+            return False
+
+    def acquire(self, source: str, owner: str, ttl: float) -> bool:
+        """Берет аренду источника, если она свободна, просрочена или уже принадлежит owner"""
+        now = time.time()
+        return self._transaction('''
+            INSERT INTO leases (source, owner, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT (source) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE leases.owner = excluded.owner OR leases.expires_at < ?
+        ''', (source, owner, now + ttl, now))
+
+    def renew(self, source: str, owner: str, ttl: float) -> bool:
+        """Продлевает аренду; False, если ее уже забрал другой процесс"""
+        return self._transaction(
+            'UPDATE leases SET expires_at = ? WHERE source = ? AND owner = ?',
+            (time.time() + ttl, source, owner)
+        )
+
+    def release(self, source: str, owner: str) -> None:
+        self._transaction('DELETE FROM leases WHERE source = ? AND owner = ?', (source, owner))
+
+    def owners(self) -> Dict[str, str]:
+        """Текущие непросроченные аренды: источник -> владелец"""
+        rows = self._db.execute(
+            'SELECT source, owner FROM leases WHERE expires_at >= ?', (time.time(),)
+        ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        self._db.close()
+
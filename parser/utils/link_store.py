@@ -0,0 +1,70 @@
+import json
+import logging
+import os
+from typing import Iterable
+
+from config import JSON_DIR, LINK_STORE_PATH
+from utils.sqlite_db import connect
+
+logger = logging.getLogger(__name__)
+
+
+class LinkStore:
+    """
+    Хранилище обработанных ссылок источника на SQLite.
+    Проверка ссылки - поиск по первичному ключу, новые ссылки добавляются
+    пакетом в одной транзакции, а журнал SQLite защищает файл при падении.
+    """
+
+    def __init__(self, source: str, path: str = LINK_STORE_PATH):
+        self.source = source
+        self._db = connect(path)
+        with self._db:
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS links (
+                    source TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    PRIMARY KEY (source, link)
+                ) WITHOUT ROWID
+            ''')
+        self._import_json()
+
+    def _import_json(self) -> None:
+        """Переносит ссылки из старого processed_links_{source}.json при первом запуске"""
+        filepath = os.path.join(JSON_DIR, f"processed_links_{self.source}.json")
+        if not os.path.exists(filepath):
+            return
+
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                links = json.load(f)
+            added = self.add_many(links)
+            # Файл оставляем как резервную копию, но больше не читаем
+            os.replace(filepath, f"{filepath}.imported")
+            logger.info(f"[{self.source}] Импортировано {added} ссылок из {filepath}")
+        except Exception as e:
+            logger.error(f"Ошибка при импорте обработанных ссылок: {e}")
+
+    def __contains__(self, link: str) -> bool:
+        row = self._db.execute(
+            'SELECT 1 FROM links WHERE source = ? AND link = ?', (self.source, link)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._db.execute(
+            'SELECT COUNT(*) FROM links WHERE source = ?', (self.source,)
+        ).fetchone()[0]
+
+    def add_many(self, links: Iterable[str]) -> int:
+        """Добавляет ссылки одной транзакцией. Возвращает число новых ссылок"""
+        with self._db:
+            before = self._db.total_changes
+            self._db.executemany(
+                'INSERT OR IGNORE INTO links (source, link) VALUES (?, ?)',
+                ((self.source, link) for link in links)
+            )
+            return self._db.total_changes - before
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,243 @@
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограмм задержек, сек.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Этапы обработки источника, по которым собирается время
+STAGES = ('listing', 'detail', 'parse', 'classify', 'sink', 'state')
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Счетчик с метками; значения меток передаются позиционно в порядке labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = defaultdict(float)
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] += amount
+
+    def get(self, *labels: str) -> float:
+        return self.values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, labels)} {value:g}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+    def snapshot(self) -> List[Dict]:
+        return [
+            {**dict(zip(self.labels, labels)), 'value': value}
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами: хранит только счетчики корзин, сумму и количество"""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Для каждого набора меток: [счетчики корзин (+Inf последней), сумма, количество]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def total(self, *labels: str) -> Tuple[float, int]:
+        """Возвращает (сумма, количество) наблюдений для набора меток"""
+        series = self.values.get(labels)
+        return (series[1], series[2]) if series else (0.0, 0)
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                bucket_labels = _format_labels(self.labels, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {total:g}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {count}")
+        return lines
+
+    def snapshot(self) -> List[Dict]:
+        return [
+            {
+                **dict(zip(self.labels, labels)),
+                'count': count,
+                'sum': round(total, 6),
+                'buckets': dict(zip([f'{bound:g}' for bound in self.buckets] + ['+Inf'], counts)),
+            }
+            for labels, (counts, total, count) in sorted(self.values.items())
+        ]
+
+
+class MetricsRegistry:
+    """Набор метрик процесса с выводом в текстовом формате Prometheus и в JSON"""
+
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+        self.started = time.time()
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, description, labels))
+
+    def histogram(self, name: str, description: str, labels: Sequence[str] = (), **options) -> Histogram:
+        return self._register(Histogram(name, description, labels, **options))
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Метрика '{metric.name}' уже зарегистрирована")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Текстовый формат экспозиции Prometheus 0.0.4"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict:
+        return {
+            'started_at': self.started,
+            'collected_at': time.time(),
+            'metrics': {
+                name: {'type': metric.kind, 'help': metric.description, 'series': metric.snapshot()}
+                for name, metric in self.metrics.items()
+            },
+        }
+
+    def dump_json(self, path: str) -> None:
+        """Сохраняет снимок метрик в JSON (атомарно, через временный файл)"""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+            logger.info(f"Метрики сохранены в {path}")
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении метрик: {e}")
+
+
+METRICS = MetricsRegistry()
+
+STAGE_SECONDS = METRICS.histogram(
+    'parser_stage_seconds', "Время этапа обработки источника, сек.", ('source', 'stage')
+)
+CYCLE_SECONDS = METRICS.histogram(
+    'parser_cycle_seconds', "Время полного цикла обработки источника, сек.", ('source',),
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+ITEMS = METRICS.counter(
+    'parser_items_total', "Новости по результату: emitted, known, duplicate", ('source', 'outcome')
+)
+HTTP_RESPONSES = METRICS.counter(
+    'parser_http_responses_total', "HTTP-ответы сайтов и classifier-api по статусу", ('source', 'status')
+)
+HTTP_RETRIES_TOTAL = METRICS.counter(
+    'parser_http_retries_total', "Повторы GET-запросов после ошибок и ответов 429/5xx", ('source',)
+)
+CACHE_LOOKUPS = METRICS.counter(
+    'parser_cache_lookups_total', "Обращения к кэшам: http (страница не изменилась), category", ('source', 'cache', 'result')
+)
+SINK_ITEMS = METRICS.counter(
+    'parser_sink_items_total', "Новости, переданные в бэкенд или локальную базу, по результату", ('source', 'result')
+)
+INGEST_RESPONSES = METRICS.counter(
+    'parser_ingest_responses_total', "Ответы API приема новостей по статусу", ('status',)
+)
+
+
+@contextmanager
+def track(source: str, stage: str):
+    """Замеряет время блока как этап stage источника"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, source, stage)
+
+
+def timed_sender(source: str, send: Callable[[List[Dict]], Awaitable[bool]]) -> Callable[[List[Dict]], Awaitable[bool]]:
+    """Оборачивает отправку пакета: время попадает в этап sink, новости - в parser_sink_items_total"""
+    async def send_timed(items: List[Dict]) -> bool:
+        with track(source, 'sink'):
+            ok = await send(items)
+        SINK_ITEMS.inc(source, 'ok' if ok else 'failed', amount=len(items))
+        return ok
+    return send_timed
+
+
+def stage_summary(source: str) -> str:
+    """Сводка по этапам источника: суммарное время и количество замеров"""
+    parts = []
+    for stage in STAGES:
+        total, count = STAGE_SECONDS.total(source, stage)
+        if count:
+            parts.append(f"{stage} {total:.2f} сек. ({count})")
+    return ', '.join(parts)
+
+
+async def start_metrics_server(host: str, port: int):
+    """Запускает HTTP-сервер с метриками в формате Prometheus на /metrics, возвращает AppRunner"""
+    from aiohttp import web  # Сервер нужен только фоновому режиму
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(
+            body=METRICS.render().encode('utf-8'),
+            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+        )
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Метрики доступны на http://{host}:{port}/metrics")
+    return runner
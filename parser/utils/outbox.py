@@ -0,0 +1,198 @@
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import OUTBOX_PATH, OUTBOX_REPLAY_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS
+from utils.ingestion_client import BatchRejectedError, dumps
+from utils.sqlite_db import connect
+
+logger = logging.getLogger(__name__)
+
+Send = Callable[[List[Dict]], Awaitable[bool]]
+
+
+class Outbox:
+    """
+    Журнал неподтвержденных пакетов источника на SQLite.
+    Пакет записывается до отправки и удаляется после ответа 201, поэтому
+    пакеты, не принятые бэкендом, переживают перезапуск и досылаются
+    в следующем цикле без повторного обхода сайта. Пакеты, отклоненные
+    бэкендом ответом 4xx, переносятся в таблицу outbox_rejected для разбора
+    вручную и не задерживают остальные.
+    """
+
+    def __init__(self, source: str, path: str = OUTBOX_PATH):
+        self.source = source
+        self._db = connect(path)
+        with self._db:
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            self._db.execute('CREATE INDEX IF NOT EXISTS outbox_source ON outbox (source, id)')
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS outbox_rejected (
+                    id INTEGER PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    status INTEGER,
+                    response TEXT,
+                    created_at REAL NOT NULL,
+                    rejected_at REAL NOT NULL
+                )
+            ''')
+
+    def __len__(self) -> int:
+        """Количество неподтвержденных пакетов источника"""
+        return self._db.execute(
+            'SELECT COUNT(*) FROM outbox WHERE source = ?', (self.source,)
+        ).fetchone()[0]
+
+    def append(self, items: List[Dict]) -> int:
+        """Записывает пакет в журнал и возвращает его номер"""
+        with self._db:
+            cursor = self._db.execute(
+                'INSERT INTO outbox (source, payload, created_at) VALUES (?, ?, ?)',
+                (self.source, dumps(items), time.time())
+            )
+        return cursor.lastrowid
+
+    def ack(self, batch_ids: List[int]) -> None:
+        """Удаляет пакеты, принятые бэкендом"""
+        with self._db:
+            self._db.executemany('DELETE FROM outbox WHERE id = ?', ((batch_id,) for batch_id in batch_ids))
+
+    def nack(self, batch_ids: List[int]) -> None:
+        """Отмечает неудачную попытку отправки"""
+        with self._db:
+            self._db.executemany(
+                'UPDATE outbox SET attempts = attempts + 1 WHERE id = ?',
+                ((batch_id,) for batch_id in batch_ids)
+            )
+
+    def reject(self, batch_id: int, error: BatchRejectedError) -> None:
+        """Переносит отклоненный бэкендом пакет из журнала в outbox_rejected"""
+        with self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO outbox_rejected (id, source, payload, status, response, created_at, rejected_at) '
+                'SELECT id, source, payload, ?, ?, created_at, ? FROM outbox WHERE id = ?',
+                (error.status, error.text, time.time(), batch_id)
+            )
+            self._db.execute('DELETE FROM outbox WHERE id = ?', (batch_id,))
+        logger.error(
+            f"[{self.source}] Пакет {batch_id} журнала отклонен бэкендом ({error.status}) "
+            f"и перенесен в outbox_rejected"
+        )
+
+    def pending(self) -> List[Tuple[int, List[Dict]]]:
+        """
+        Возвращает неподтвержденные пакеты источника в порядке записи.
+        Пакеты, исчерпавшие OUTBOX_MAX_ATTEMPTS попыток, остаются в журнале
+        для разбора вручную.
+        """
+        rows = self._db.execute(
+            'SELECT id, payload FROM outbox WHERE source = ? AND attempts < ? ORDER BY id',
+            (self.source, OUTBOX_MAX_ATTEMPTS)
+        ).fetchall()
+        return [(batch_id, json.loads(payload)) for batch_id, payload in rows]
+
+    def sender(self, send: Send, on_stored: Optional[Callable[[List[Dict]], None]] = None) -> Send:
+        """
+        Оборачивает send: пакет попадает в журнал до отправки и удаляется после 201.
+        on_stored(items) вызывается сразу после записи в журнал: доставка пакета
+        с этого момента гарантирована.
+        """
+        async def send_with_outbox(items: List[Dict]) -> bool:
+            batch_id = self.append(items)
+            if on_stored is not None:
+                on_stored(items)
+            try:
+                sent = await send(items)
+            except BatchRejectedError as e:
+                self.reject(batch_id, e)
+                return False
+            if sent:
+                self.ack([batch_id])
+                return True
+            self.nack([batch_id])
+            return False
+        return send_with_outbox
+
+    async def replay(self, send: Send, batch_size: int = OUTBOX_REPLAY_BATCH_SIZE) -> int:
+        """
+        Досылает неподтвержденные пакеты, объединяя их в запросы до batch_size новостей.
+        Если объединенный запрос не принят, его пакеты отправляются по одному:
+        отклоненный ответом 4xx пакет переносится в outbox_rejected, остальные
+        доставляются. Останавливается, только когда бэкенд не принял одиночный
+        пакет без ответа 4xx: он, скорее всего, еще недоступен.
+        Возвращает количество доставленных новостей.
+        """
+        pending = self.pending()
+        if not pending:
+            return 0
+
+        total = sum(len(items) for _, items in pending)
+        logger.info(f"[{self.source}] Повторная отправка {total} новостей из {len(pending)} пакетов журнала")
+
+        delivered = 0
+        rejected = 0
+        chunk: List[Tuple[int, List[Dict]]] = []
+        size = 0
+        for index, (batch_id, items) in enumerate(pending):
+            chunk.append((batch_id, items))
+            size += len(items)
+            if size < batch_size and index < len(pending) - 1:
+                continue
+
+            merged = await self._replay_chunk(send, chunk) if len(chunk) > 1 else None
+            if merged:
+                delivered += merged
+                chunk, size = [], 0
+                continue
+
+            # Объединенный запрос не принят: выясняем, какой пакет ему мешает
+            for batch in chunk:
+                sent = await self._replay_chunk(send, [batch])
+                if sent is None:
+                    rejected += len(batch[1])
+                    continue
+                if not sent:
+                    logger.warning(
+                        f"[{self.source}] В журнале осталось {total - delivered - rejected} неотправленных новостей"
+                    )
+                    return delivered
+                delivered += sent
+            chunk, size = [], 0
+
+        return delivered
+
+    async def _replay_chunk(self, send: Send, chunk: List[Tuple[int, List[Dict]]]) -> Optional[int]:
+        """
+        Отправляет пакеты chunk одним запросом. Возвращает количество доставленных
+        новостей, 0 - если бэкенд недоступен, None - если запрос отклонен ответом 4xx.
+        Одиночный пакет при отказе отмечается неудачной попыткой или переносится
+        в outbox_rejected; пакеты объединенного запроса остаются в журнале как есть.
+        """
+        batch_ids = [batch_id for batch_id, _ in chunk]
+        items = [item for _, batch in chunk for item in batch]
+        try:
+            sent = await send(items)
+        except BatchRejectedError as e:
+            if len(chunk) == 1:
+                self.reject(batch_ids[0], e)
+            return None
+        if sent:
+            self.ack(batch_ids)
+            return len(items)
+        if len(chunk) == 1:
+            self.nack(batch_ids)
+        return 0
+
+    def close(self) -> None:
+        self._db.close()
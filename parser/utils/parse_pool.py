@@ -0,0 +1,57 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from config import PARSE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+# Экземпляры парсеров внутри процесса пула: создаются один раз на процесс
+_worker_parsers: Dict[Tuple[type, str], Any] = {}
+
+
+def parse_detail(parser_class: type, extraction_backend: str, html: str) -> Optional[Dict]:
+    """
+    Разбирает детальную страницу в процессе пула: HTML на входе, новость на выходе.
+    Класс парсера передается по ссылке (модуль и имя), а его экземпляр
+    без HTTP-сессии создается в процессе пула при первом вызове.
+    """
+    key = (parser_class, extraction_backend)
+    parser = _worker_parsers.get(key)
+    if parser is None:
+        parser = _worker_parsers[key] = parser_class(extraction_backend=extraction_backend)
+    return parser.parse_news_detail(html)
+
+
+def get_parse_pool(workers: int = PARSE_WORKERS) -> Optional[ProcessPoolExecutor]:
+    """
+    Возвращает общий для процесса пул разбора страниц или None, если workers = 0.
+    Процессы запускаются через spawn: fork процесса с работающим циклом
+    событий, потоками резолвера и открытыми SQLite небезопасен.
+    """
+    global _pool
+    if workers <= 0:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        logger.info(f"Пул разбора страниц: {workers} процессов")
+    return _pool
+
+
+def reset_parse_pool() -> None:
+    """Отбрасывает сломанный пул (упал процесс); следующий вызов get_parse_pool создаст новый"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def close_parse_pool() -> None:
+    """Останавливает процессы пула разбора"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
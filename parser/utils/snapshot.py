@@ -0,0 +1,117 @@
+import gzip
+import logging
+import os
+import time
+from typing import BinaryIO, Dict, Optional
+
+from config import (
+    SNAPSHOT_DIR,
+    SNAPSHOT_COMPRESSION,
+    SNAPSHOT_ROTATE_BYTES,
+    SNAPSHOT_ROTATE_SECONDS,
+)
+from utils.ingestion_client import dumps
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+class SnapshotWriter:
+    """
+    Журнал новостей источника в формате NDJSON (одна новость - одна строка).
+    Новости дописываются по мере готовности и не изменяются; файл сменяется
+    по размеру или возрасту и может сжиматься gzip или zstd.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        directory: str = SNAPSHOT_DIR,
+        compression: str = SNAPSHOT_COMPRESSION,
+        rotate_bytes: int = SNAPSHOT_ROTATE_BYTES,
+        rotate_seconds: float = SNAPSHOT_ROTATE_SECONDS,
+    ):
+        if compression not in EXTENSIONS:
+            raise ValueError(f"Неизвестное сжатие снимков '{compression}'")
+        if compression == 'zstd':
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                logger.warning("zstandard не установлен, снимки сжимаются gzip")
+                compression = 'gzip'
+
+        self.source = source
+        self.directory = directory
+        self.compression = compression
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.path: Optional[str] = None
+        self._file: Optional[BinaryIO] = None
+        self._raw: Optional[BinaryIO] = None  # Файл под потоком zstd
+        self._opened_at = 0.0
+        self._written = 0  # Байт NDJSON в текущем файле до сжатия
+        self.items_written = 0
+
+    async def put(self, item: Dict) -> None:
+        """Дописывает новость; интерфейс совпадает с очередью отправки"""
+        self.write(item)
+
+    def write(self, item: Dict) -> None:
+        if self._file is None or self._should_rotate():
+            self._open()
+        line = dumps(item) + b'\n'
+        self._file.write(line)
+        self._written += len(line)
+        self.items_written += 1
+
+    def _should_rotate(self) -> bool:
+        return (
+            self._written >= self.rotate_bytes
+            or time.monotonic() - self._opened_at >= self.rotate_seconds
+        )
+
+    def _open(self) -> None:
+        """Закрывает текущий файл и начинает новый"""
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        extension = EXTENSIONS[self.compression]
+        path = os.path.join(self.directory, f"news_{self.source}-{stamp}.ndjson{extension}")
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.directory, f"news_{self.source}-{stamp}-{suffix}.ndjson{extension}")
+
+        if self.compression == 'gzip':
+            self._file = gzip.open(path, 'wb', compresslevel=6)
+        elif self.compression == 'zstd':
+            import zstandard
+            self._raw = open(path, 'wb')
+            self._file = zstandard.ZstdCompressor(level=3).stream_writer(self._raw)
+        else:
+            self._file = open(path, 'wb')
+
+        self.path = path
+        self._opened_at = time.monotonic()
+        self._written = 0
+        logger.info(f"[{self.source}] Новый файл снимка: {path}")
+
+    def flush(self) -> None:
+        """Сбрасывает записанное на диск, чтобы файл можно было читать до закрытия"""
+        if self._file is None:
+            return
+        if self.compression == 'zstd':
+            import zstandard
+            self._file.flush(zstandard.FLUSH_BLOCK)
+        else:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        if self._raw is not None and not self._raw.closed:
+            self._raw.close()
+        self._file = None
+        self._raw = None
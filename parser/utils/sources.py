@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from config import SOURCES, SOURCES_FILE, DAEMON_INTERVAL, DAEMON_INTERVALS
+
+logger = logging.getLogger(__name__)
+
+
+class SourceConfig:
+    """
+    Настройки одного источника: интервал циклов в фоновом режиме и бюджет
+    параллельности - аргументы конструктора парсера (pool_limit_per_host,
+    rate_limit, detail_workers, pipeline_width и т.п.).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval: float = DAEMON_INTERVAL,
+        options: Optional[Dict[str, Any]] = None,
+        enabled: bool = True,
+    ):
+        self.name = name
+        self.interval = interval
+        self.options = options or {}
+        self.enabled = enabled
+
+    def __repr__(self) -> str:
+        return f"SourceConfig({self.name!r}, interval={self.interval}, options={self.options})"
+
+
+def load_sources(path: str = SOURCES_FILE) -> List[SourceConfig]:
+    """
+    Читает включенные источники из JSON-файла вида
+        {"sources": [{"name": "rscf", "interval": 120, "options": {"rate_limit": 10}}]}
+    Если файла нет, используются SOURCES и DAEMON_INTERVALS из config.py.
+    """
+    if not os.path.exists(path):
+        return [SourceConfig(name, DAEMON_INTERVALS.get(name, DAEMON_INTERVAL)) for name in SOURCES]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    sources = []
+    seen = set()
+    for entry in data.get('sources', []):
+        name = entry.get('name')
+        if not name:
+            raise ValueError(f"В {path} у источника не указано имя: {entry}")
+        if name in seen:
+            raise ValueError(f"В {path} источник '{name}' указан дважды")
+        seen.add(name)
+
+        source = SourceConfig(
+            name,
+            interval=float(entry.get('interval', DAEMON_INTERVAL)),
+            options=entry.get('options'),
+            enabled=entry.get('enabled', True),
+        )
+        if source.enabled:
+            sources.append(source)
+    return sources
@@ -0,0 +1,17 @@
+import os
+import sqlite3
+
+from config import SQLITE_JOURNAL_MODE
+
+
+def connect(path: str, journal_mode: str = SQLITE_JOURNAL_MODE, **kwargs) -> sqlite3.Connection:
+    """
+    Открывает базу хранилища парсера в режиме журнала journal_mode.
+    С WAL достаточно synchronous=NORMAL (файл не портится при падении процесса);
+    журнал DELETE, нужный для каталога, общего для нескольких машин, пишется с FULL.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    db = sqlite3.connect(path, timeout=30, **kwargs)
+    db.execute(f'PRAGMA journal_mode={journal_mode}')
+    db.execute(f"PRAGMA synchronous={'NORMAL' if journal_mode == 'WAL' else 'FULL'}")
+    return db
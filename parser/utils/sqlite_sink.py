@@ -0,0 +1,60 @@
+import logging
+from typing import Dict, List
+
+from config import LOCAL_DB_PATH
+from utils.sqlite_db import connect
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteNewsStore:
+    """
+    Локальная база новостей на SQLite - замена бэкенда для работы без
+    Django и MySQL. Одно соединение на весь процесс, схема создается один
+    раз, пакет вставляется одной транзакцией через executemany.
+    """
+
+    def __init__(self, path: str = LOCAL_DB_PATH):
+        self.path = path
+        self._db = connect(path)
+        self._db.execute('PRAGMA temp_store=MEMORY')
+        self._db.execute('PRAGMA cache_size=-65536')  # 64 МБ страничного кэша
+        with self._db:
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS news (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    author TEXT,
+                    category TEXT,
+                    link TEXT UNIQUE,
+                    date TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+        self.items_inserted = 0
+
+    def insert_many(self, items: List[Dict]) -> int:
+        """Вставляет пакет одной транзакцией, пропуская дубликаты по link. Возвращает число новых строк"""
+        with self._db:
+            before = self._db.total_changes
+            self._db.executemany('''
+                INSERT OR IGNORE INTO news (title, description, author, category, link, date)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                (
+                    item.get('title', ''),
+                    item.get('description', ''),
+                    item.get('author', ''),
+                    item.get('category', ''),
+                    item.get('link', ''),
+                    item.get('date', ''),
+                )
+                for item in items
+            ))
+            inserted = self._db.total_changes - before
+        self.items_inserted += inserted
+        return inserted
+
+    def close(self) -> None:
+        self._db.close()